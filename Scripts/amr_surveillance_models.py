@@ -8,26 +8,48 @@ Author: Dr. Siddalingaiah H S
 License: MIT
 """
 
+import hashlib
 import pandas as pd
 import numpy as np
 from scipy import stats
+from scipy import sparse
 from scipy.optimize import curve_fit
+from scipy.sparse.csgraph import connected_components, shortest_path
 import matplotlib.pyplot as plt
 import seaborn as sns
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import networkx as nx
-from sklearn.ensemble import RandomForestRegressor, GradientBoostingClassifier
+from joblib import Parallel, delayed
+from sklearn.ensemble import RandomForestRegressor, GradientBoostingClassifier, HistGradientBoostingRegressor
+from sklearn.inspection import permutation_importance
 from sklearn.model_selection import train_test_split, GridSearchCV
 from sklearn.metrics import classification_report, mean_squared_error, r2_score
-from sklearn.preprocessing import StandardScaler, LabelEncoder
 from sklearn.cluster import KMeans, DBSCAN
 from imblearn.over_sampling import SMOTE
 from imblearn.ensemble import BalancedRandomForestClassifier
 import warnings
 warnings.filterwarnings('ignore')
 
+try:
+    from numba import njit, prange, vectorize
+except ImportError:  # Numba is optional; distance and rate kernels fall back to NumPy
+    njit = None
+
+try:
+    import igraph as ig
+except ImportError:  # igraph is optional; betweenness falls back to NetworkX
+    ig = None
+
+try:
+    import lightgbm as lgb
+except ImportError:  # LightGBM is optional; only the 'gradient_boosting' model needs it
+    lgb = None
+
+# Intervention comparisons shorter than this run in-process
+_PARALLEL_MIN_INTERVENTIONS = 8
+
 # Set style for all visualizations
 plt.style.use('seaborn-v0_8')
 sns.set_palette("husl")
@@ -44,12 +66,13 @@ class AMRSurveillanceAnalyzer:
         self.pathogens = []
         self.antibiotics = []
         self.time_periods = []
+        self._by_combination = None
+        self._yearly_sums = None
+        self._combination_sums = None
 
     def load_glass_data(self, data_path):
         """Load WHO GLASS surveillance data"""
         try:
-            self.data = pd.read_csv(data_path)
-
             # Standardize column names to WHO GLASS format
             column_mapping = {
                 'organism': 'pathogen',
@@ -59,13 +82,44 @@ class AMRSurveillanceAnalyzer:
                 'year': 'reporting_year',
                 'sample_size': 'total_isolates'
             }
+
+            # Parse low-cardinality labels straight into categoricals and rates
+            # as float32, under both the source and the standardized names
+            column_dtypes = {}
+            for source, standard in column_mapping.items():
+                if standard in ('pathogen', 'antimicrobial', 'country_name'):
+                    column_dtypes[source] = column_dtypes[standard] = 'category'
+                elif standard == 'resistance_percentage':
+                    column_dtypes[source] = column_dtypes[standard] = np.float32
+
+            self.data = pd.read_csv(data_path, dtype=column_dtypes)
             self.data = self.data.rename(columns=column_mapping)
 
+            # Smallest integer type for years; isolate counts stay int32 so their
+            # sums and products cannot wrap at typical GLASS sample sizes
+            self.data['reporting_year'] = pd.to_numeric(self.data['reporting_year'], downcast='integer')
+            self.data['total_isolates'] = self.data['total_isolates'].astype(np.int32)
+
             # Extract unique values
             self.pathogens = self.data['pathogen'].unique().tolist()
             self.antibiotics = self.data['antimicrobial'].unique().tolist()
             self.time_periods = sorted(self.data['reporting_year'].unique())
 
+            # Index rows by (pathogen, antimicrobial) for per-combination lookups;
+            # levels are unnamed so they never clash with the column labels
+            self._by_combination = self.data.set_index(
+                ['pathogen', 'antimicrobial'], drop=False
+            ).rename_axis([None, None]).sort_index()
+
+            # Aggregate once per (pathogen, antimicrobial, year) and per combination;
+            # trends, heatmaps and treemaps are served from these sums
+            self._yearly_sums = self._resistance_sums(
+                self.data, ['pathogen', 'antimicrobial', 'reporting_year']
+            )
+            self._combination_sums = self._yearly_sums.groupby(
+                level=['pathogen', 'antimicrobial'], observed=True
+            ).sum()
+
             print(f"✅ Loaded WHO GLASS data: {len(self.data)} records")
             print(f"   Pathogens: {len(self.pathogens)}")
             print(f"   Antibiotics: {len(self.antibiotics)}")
@@ -80,57 +134,74 @@ class AMRSurveillanceAnalyzer:
     def calculate_resistance_trend(self, pathogen, antibiotic, region=None):
         """Calculate resistance trend over time for specific pathogen-drug combination"""
 
-        # Filter data
-        filtered_data = self.data[
-            (self.data['pathogen'] == pathogen) &
-            (self.data['antimicrobial'] == antibiotic)
-        ]
-
-        if region:
-            filtered_data = filtered_data[filtered_data['country_name'] == region]
+        try:
+            if region:
+                # Regional trends need country-level rows for the combination
+                filtered_data = self._by_combination.loc[[(pathogen, antibiotic)]]
+                filtered_data = filtered_data[filtered_data['country_name'] == region]
+                yearly_sums = self._resistance_sums(filtered_data, ['reporting_year'])
+            else:
+                # Precomputed per-year sums for the combination
+                yearly_sums = self._yearly_sums.loc[(pathogen, antibiotic)]
+        except KeyError:
+            return None, "No data available for specified combination"
 
-        if filtered_data.empty:
+        if yearly_sums.empty:
             return None, "No data available for specified combination"
 
-        # Group by year and calculate weighted mean
-        yearly_trends = self._calculate_weighted_resistance(filtered_data)
+        # Calculate weighted mean by year
+        yearly_trends = self._weighted_resistance_from_sums(yearly_sums)
 
         return yearly_trends, None
 
+    @staticmethod
+    def _resistance_sums(data, keys):
+        """Per-group sums (Σn, Σr·n, Σn·r·(100-r), Σr and record count) for resistance summaries"""
+
+        # Accumulate in float64 / int64 whatever the stored precision
+        resistance = data['resistance_percentage'].astype(np.float64)
+        isolates = data['total_isolates'].astype(np.int64)
+        data = data.assign(
+            _n=isolates,
+            _r=resistance,
+            _rn=resistance * isolates,
+            _var=isolates * resistance * (100 - resistance)
+        )
+
+        return data.groupby(keys, sort=True, observed=True).agg(
+            total_isolates=('_n', 'sum'),
+            weighted_sum=('_rn', 'sum'),
+            variance_sum=('_var', 'sum'),
+            resistance_sum=('_r', 'sum'),
+            record_count=('resistance_percentage', 'count')
+        )
+
     def _calculate_weighted_resistance(self, data):
         """Calculate weighted resistance rates by sample size"""
 
-        yearly_stats = []
-
-        for year in data['reporting_year'].unique():
-            year_data = data[data['reporting_year'] == year]
-
-            if year_data.empty:
-                continue
-
-            # Weighted mean
-            total_isolates = year_data['total_isolates'].sum()
-            if total_isolates > 0:
-                weighted_resistance = (
-                    year_data['resistance_percentage'] * year_data['total_isolates']
-                ).sum() / total_isolates
-
-                weighted_se = np.sqrt(
-                    (year_data['total_isolates'] / total_isolates**2 * (
-                        year_data['resistance_percentage'] * (100 - year_data['resistance_percentage'])
-                    )).sum()
-                ) / 100
-
-            yearly_stats.append({
-                'year': year,
-                'resistance_rate': weighted_resistance,
-                'standard_error': weighted_se,
-                'sample_size': total_isolates,
-                'ci_lower': max(0, weighted_resistance - 1.96 * weighted_se),
-                'ci_upper': min(100, weighted_resistance + 1.96 * weighted_se)
-            })
+        return self._weighted_resistance_from_sums(
+            self._resistance_sums(data, ['reporting_year'])
+        )
+
+    @staticmethod
+    def _weighted_resistance_from_sums(yearly_sums):
+        """Weighted yearly resistance rates from per-year sums indexed by year"""
 
-        return pd.DataFrame(yearly_stats).sort_values('year')
+        total_isolates = yearly_sums['total_isolates']
+
+        # Weighted mean and standard error (NaN for years without isolates)
+        valid = total_isolates > 0
+        weighted_resistance = (yearly_sums['weighted_sum'] / total_isolates).where(valid)
+        weighted_se = (np.sqrt(yearly_sums['variance_sum']) / (total_isolates * 100)).where(valid)
+
+        return pd.DataFrame({
+            'year': yearly_sums.index.values,
+            'resistance_rate': weighted_resistance.values,
+            'standard_error': weighted_se.values,
+            'sample_size': total_isolates.values,
+            'ci_lower': np.clip(weighted_resistance.values - 1.96 * weighted_se.values, 0, None),
+            'ci_upper': np.clip(weighted_resistance.values + 1.96 * weighted_se.values, None, 100)
+        })
 
     def create_resistance_heatmap(self, pathogen_list=None, antibiotic_list=None):
         """Create resistance pattern heatmap"""
@@ -140,26 +211,14 @@ class AMRSurveillanceAnalyzer:
         if antibiotic_list is None:
             antibiotic_list = self.antibiotics[:10]  # Top 10 antibiotics
 
-        # Calculate average resistance for each pathogen-antibiotic combination
-        heatmap_data = []
-
-        for pathogen in pathogen_list:
-            row_data = {'Pathogen': pathogen}
-            for antibiotic in antibiotic_list:
-                subset = self.data[
-                    (self.data['pathogen'] == pathogen) &
-                    (self.data['antimicrobial'] == antibiotic)
-                ]
-
-                if not subset.empty:
-                    avg_resistance = subset['resistance_percentage'].mean()
-                    row_data[antibiotic] = avg_resistance
-                else:
-                    row_data[antibiotic] = None
-
-            heatmap_data.append(row_data)
+        # Average resistance for each pathogen-antibiotic combination
+        heatmap_data = (
+            self._combination_sums['resistance_sum'] / self._combination_sums['record_count']
+        ).unstack('antimicrobial')
 
-        return pd.DataFrame(heatmap_data).set_index('Pathogen')
+        return heatmap_data.reindex(
+            index=pathogen_list, columns=antibiotic_list
+        ).rename_axis(index='Pathogen', columns=None)
 
     def predict_future_trends(self, pathogen, antibiotic, years_ahead=5):
         """Predict future AMR trends using time series analysis"""
@@ -171,19 +230,21 @@ class AMRSurveillanceAnalyzer:
 
         # Prepare for forecasting
         trends = trends.dropna()
-        X = trends['year'].values.reshape(-1, 1)
+        years = trends['year'].values
         y = trends['resistance_rate'].values
 
-        # Fit polynomial trend
+        # Fit quadratic trend via normal equations (years centred for conditioning)
         try:
-            z = np.polyfit(X.flatten(), y, 2)
-            p = np.poly1d(z)
+            year_offset = years.mean()
+            X = np.vander(years - year_offset, 3)
+            XtX_inv = np.linalg.inv(X.T @ X)
+            coefficients = XtX_inv @ (X.T @ y)
 
             # Predict future years
-            future_years = np.array(range(trends['year'].max() + 1,
-                                         trends['year'].max() + years_ahead + 1))
+            future_years = np.arange(years.max() + 1, years.max() + years_ahead + 1)
+            X_future = np.vander(future_years - year_offset, 3)
 
-            predictions = p(future_years)
+            predictions = X_future @ coefficients
 
             # Ensure predictions are within bounds
             predictions = np.clip(predictions, 0, 100)
@@ -194,9 +255,11 @@ class AMRSurveillanceAnalyzer:
                 'prediction_type': 'forecast'
             })
 
-            # Calculate prediction confidence intervals
-            mse = np.mean((y - p(X.flatten())) ** 2)
-            prediction_variance = mse * (1 + 1/len(X) + (future_years - np.mean(X))**2 / np.sum((X.flatten() - np.mean(X))**2))
+            # Prediction intervals: σ²·(1 + xᵀ(XᵀX)⁻¹x) with n - 3 residual degrees of freedom
+            residual_variance = ((y - X @ coefficients) ** 2).sum() / max(len(y) - 3, 1)
+            prediction_variance = residual_variance * (
+                1 + np.einsum('ij,jk,ik->i', X_future, XtX_inv, X_future)
+            )
             prediction_se = np.sqrt(prediction_variance)
 
             results['ci_lower'] = np.clip(results['predicted_resistance'] - 1.96 * prediction_se, 0, 100)
@@ -210,29 +273,25 @@ class AMRSurveillanceAnalyzer:
     def create_resistance_treemap(self, threshold=20):
         """Create treemap visualization of high-priority AMR threats"""
 
-        # Calculate average resistance for each combination
-        summary_data = []
-        for pathogen in self.pathogens:
-            for antibiotic in self.antibiotics:
-                subset = self.data[
-                    (self.data['pathogen'] == pathogen) &
-                    (self.data['antimicrobial'] == antibiotic)
-                ]
-
-                if len(subset) >= 3:  # At least 3 data points
-                    avg_resistance = subset['resistance_percentage'].mean()
-                    if avg_resistance >= threshold:
-                        summary_data.append({
-                            'pathogen': pathogen,
-                            'antibiotic': antibiotic,
-                            'avg_resistance': avg_resistance,
-                            'data_points': len(subset)
-                        })
-
-        if not summary_data:
+        # Average resistance and record count for each combination
+        summary = pd.DataFrame({
+            'mean': self._combination_sums['resistance_sum'] / self._combination_sums['record_count'],
+            'count': self._combination_sums['record_count']
+        })
+
+        # At least 3 data points and average at or above threshold
+        summary = summary[(summary['count'] >= 3) & (summary['mean'] >= threshold)]
+
+        if summary.empty:
             return None, "No combinations meet threshold"
 
-        return pd.DataFrame(summary_data), None
+        summary_data = summary.reset_index().rename(columns={
+            'antimicrobial': 'antibiotic',
+            'mean': 'avg_resistance',
+            'count': 'data_points'
+        })
+
+        return summary_data, None
 
 
 class StewardshipCalculator:
@@ -240,6 +299,10 @@ class StewardshipCalculator:
     Antimicrobial Stewardship Impact Modeling and Simulation
     """
 
+    _BASELINE_RESISTANCE = 30.0  # Starting point
+    _BASELINE_USAGE = 100.0  # Starting usage
+    _RESISTANCE_DELAY = 2  # Years delayed effect
+
     def __init__(self):
         """Initialize stewardship calculator"""
         self.baseline_usage = {}
@@ -272,47 +335,35 @@ class StewardshipCalculator:
 
         params = self.interventions[intervention_name]
 
-        # Simulate resistance rate changes
-        resistance_trend = []
-        usage_trend = []
+        baseline_resistance = self._BASELINE_RESISTANCE
+        baseline_usage = self._BASELINE_USAGE
+        resistance_delay = self._RESISTANCE_DELAY
 
-        baseline_resistance = 30.0  # Starting point
-        baseline_usage = 100.0  # Starting usage
+        # Apply intervention effects
+        usage_reduction = params.get('usage_reduction', 0) / 100
+        resistance_impact = params.get('resistance_impact', 0)
 
-        for year in range(simulation_years + 1):
-            if year == 0:
-                year_resistance = baseline_resistance
-                year_usage = baseline_usage
-            else:
-                # Apply intervention effects
-                usage_reduction = params.get('usage_reduction', 0) / 100
-                resistance_impact = params.get('resistance_impact', 0)
-
-                # Gradual usage reduction
-                year_usage = baseline_usage * (1 - usage_reduction * year / simulation_years)
-
-                # Resistance reduction (delayed effect)
-                resistance_delay = 2  # Years delayed effect
-                if year > resistance_delay:
-                    year_resistance = baseline_resistance * (1 - abs(resistance_impact) * (year - resistance_delay) / simulation_years)
-                else:
-                    year_resistance = baseline_resistance
-
-            resistance_trend.append({
-                'year': year,
-                'resistance_rate': max(0, year_resistance),
-                'intervention': intervention_name
-            })
+        years = np.arange(simulation_years + 1)
+        year_fraction = years / max(simulation_years, 1)
 
-            usage_trend.append({
-                'year': year,
-                'usage_rate': max(0, year_usage),
-                'intervention': intervention_name
-            })
+        # Gradual usage reduction
+        usage_rate = baseline_usage * (1 - usage_reduction * year_fraction)
+
+        # Resistance reduction (delayed effect)
+        delayed_fraction = np.maximum(years - resistance_delay, 0) / max(simulation_years, 1)
+        resistance_rate = baseline_resistance * (1 - abs(resistance_impact) * delayed_fraction)
 
         return {
-            'resistance_trend': pd.DataFrame(resistance_trend),
-            'usage_trend': pd.DataFrame(usage_trend),
+            'resistance_trend': pd.DataFrame({
+                'year': years,
+                'resistance_rate': np.maximum(resistance_rate, 0),
+                'intervention': intervention_name
+            }),
+            'usage_trend': pd.DataFrame({
+                'year': years,
+                'usage_rate': np.maximum(usage_rate, 0),
+                'intervention': intervention_name
+            }),
             'parameters': params
         }, None
 
@@ -349,30 +400,92 @@ class StewardshipCalculator:
             'payback_period_years': payback_period
         }, None
 
-    def compare_interventions(self, intervention_list):
-        """Compare multiple stewardship interventions"""
+    def batch_cost_benefit(self, intervention_df, hospital_size=500, daily_bed_cost=1500,
+                           avg_length_stay=5, simulation_years=3):
+        """
+        Cost-benefit and end-of-simulation outcomes for a table of interventions
+
+        Parameters:
+        intervention_df: DataFrame indexed by intervention name with the
+        define_intervention parameter keys as columns
+        """
 
-        comparison_results = {}
+        if intervention_df.empty:
+            return None, "No interventions provided"
 
-        for intervention in intervention_list:
-            results, error = self.simulate_stewardship_impact(intervention, 3)
+        def column(name, default):
+            # Missing columns and missing cells take the per-intervention defaults
+            if name not in intervention_df:
+                return pd.Series(default, index=intervention_df.index, dtype=float)
+            return intervention_df[name].astype(float).fillna(default)
 
-            if results:
-                # Extract 3-year outcomes
-                resistance_end = results['resistance_trend'].iloc[-1]['resistance_rate']
-                usage_end = results['usage_trend'].iloc[-1]['usage_rate']
+        # Same arithmetic as calculate_cost_benefit, one column at a time
+        cost_savings_hospital = column('infections_prevented', 100) * avg_length_stay * daily_bed_cost
+        implementation_cost = column('implementation_cost', 50000)
+        annual_maintenance = column('annual_cost', 25000)
+        net_benefit_year1 = cost_savings_hospital - annual_maintenance
 
-                costs_benefits, _ = self.calculate_cost_benefit(intervention)
+        # Final year of simulate_stewardship_impact
+        year_span = max(simulation_years, 1)
+        usage_fraction = simulation_years / year_span
+        delayed_fraction = max(simulation_years - self._RESISTANCE_DELAY, 0) / year_span
+        usage_end = np.maximum(
+            self._BASELINE_USAGE * (1 - column('usage_reduction', 0) / 100 * usage_fraction), 0
+        )
+        resistance_end = np.maximum(
+            self._BASELINE_RESISTANCE * (1 - column('resistance_impact', 0).abs() * delayed_fraction), 0
+        )
 
-                comparison_results[intervention] = {
-                    'resistance_rate_3yr': resistance_end,
-                    'usage_rate_3yr': usage_end,
-                    'annual_cost_savings': costs_benefits.get('annual_cost_savings', 0) if costs_benefits else 0,
-                    'payback_years': costs_benefits.get('payback_period_years', float('inf')) if costs_benefits else float('inf')
-                }
+        return pd.DataFrame({
+            'annual_cost_savings': cost_savings_hospital,
+            'implementation_cost': implementation_cost,
+            'annual_maintenance': annual_maintenance,
+            'net_benefit_year1': net_benefit_year1,
+            'roi_year1': net_benefit_year1 / implementation_cost * 100,
+            'payback_period_years': implementation_cost / np.maximum(cost_savings_hospital, 1),
+            'resistance_reduction_final': self._BASELINE_RESISTANCE - resistance_end,
+            'usage_reduction_final': self._BASELINE_USAGE - usage_end
+        }, index=intervention_df.index), None
+
+    def compare_interventions(self, intervention_list, n_jobs=-1):
+        """Compare multiple stewardship interventions"""
+
+        # Simulations are independent; fan out across processes only when the
+        # list is long enough to amortize worker start-up
+        if len(intervention_list) < _PARALLEL_MIN_INTERVENTIONS:
+            n_jobs = 1
+
+        outcomes = Parallel(n_jobs=n_jobs, backend='loky')(
+            delayed(self._simulate_one)(intervention) for intervention in intervention_list
+        )
+
+        comparison_results = {
+            intervention: result for intervention, result in outcomes if result is not None
+        }
 
         return pd.DataFrame(comparison_results).T, None
 
+    def _simulate_one(self, intervention):
+        """Simulate one intervention and extract its 3-year outcomes"""
+
+        results, error = self.simulate_stewardship_impact(intervention, 3)
+
+        if not results:
+            return intervention, None
+
+        # Extract 3-year outcomes
+        resistance_end = results['resistance_trend'].iloc[-1]['resistance_rate']
+        usage_end = results['usage_trend'].iloc[-1]['usage_rate']
+
+        costs_benefits, _ = self.calculate_cost_benefit(intervention)
+
+        return intervention, {
+            'resistance_rate_3yr': resistance_end,
+            'usage_rate_3yr': usage_end,
+            'annual_cost_savings': costs_benefits.get('annual_cost_savings', 0) if costs_benefits else 0,
+            'payback_years': costs_benefits.get('payback_period_years', float('inf')) if costs_benefits else float('inf')
+        }
+
 
 class TransmissionNetworkAnalyzer:
     """
@@ -385,6 +498,20 @@ class TransmissionNetworkAnalyzer:
         self.genetic_data = None
         self.metadata = None
         self.network = None
+        self._distance_cache = None
+        self._network_matrix = None
+        self._matrix_network = None
+
+    @property
+    def genetic_data(self):
+        """Sequences by isolate ID"""
+        return self._genetic_data
+
+    @genetic_data.setter
+    def genetic_data(self, sequences):
+        # New sequences invalidate the fingerprint until load_genetic_data recomputes it
+        self._genetic_data = sequences
+        self._sequence_hash = None
 
     def load_genetic_data(self, sequence_file, metadata_file=None):
         """Load genomic sequencing data and metadata"""
@@ -409,6 +536,12 @@ class TransmissionNetworkAnalyzer:
 
             self.genetic_data = sequences
 
+            # Fingerprint the sequences so the distance matrix can be reused
+            digest = hashlib.blake2b()
+            for isolate_id, sequence in sequences.items():
+                digest.update(f"{isolate_id}\0{sequence}\n".encode())
+            self._sequence_hash = digest.digest()
+
             print(f"✅ Loaded {len(sequences)} genetic sequences")
             return True
 
@@ -422,22 +555,27 @@ class TransmissionNetworkAnalyzer:
         if not self.genetic_data:
             return None, "No genetic data loaded"
 
+        # Reuse the matrix computed for the same loaded sequences
+        if (self._sequence_hash is not None and self._distance_cache is not None
+                and self._distance_cache[0] == self._sequence_hash):
+            return self._distance_cache[1], None
+
         isolate_ids = list(self.genetic_data.keys())
-        n_isolates = len(isolate_ids)
+        sequences = [self.genetic_data[isolate_id].encode('ascii') for isolate_id in isolate_ids]
 
-        # Initialize distance matrix
-        distance_matrix = np.zeros((n_isolates, n_isolates))
+        # Hamming distance requires aligned sequences
+        if len({len(seq) for seq in sequences}) > 1:
+            return None, "Sequences must be aligned to equal length"
 
-        # Calculate pairwise Hamming distances
-        for i in range(n_isolates):
-            for j in range(i + 1, n_isolates):
-                seq1 = self.genetic_data[isolate_ids[i]]
-                seq2 = self.genetic_data[isolate_ids[j]]
+        # One row of byte codes per isolate
+        encoded = np.frombuffer(b''.join(sequences), dtype=np.uint8).reshape(len(sequences), -1)
 
-                # Calculate Hamming distance
-                distance = sum(c1 != c2 for c1, c2 in zip(seq1, seq2))
-                distance_matrix[i, j] = distance
-                distance_matrix[j, i] = distance
+        # Calculate pairwise Hamming distances (bit-packed kernel for pure A/C/G/T)
+        packed = _pack_nucleotides(encoded) if _hamming_packed is not None else None
+        if packed is not None:
+            distance_matrix = _hamming_packed(packed)
+        else:
+            distance_matrix = _hamming_distance_matrix(encoded)
 
         # Create DataFrame for easier handling
         distance_df = pd.DataFrame(
@@ -446,6 +584,11 @@ class TransmissionNetworkAnalyzer:
             columns=isolate_ids
         )
 
+        # Keep only the latest matrix; sequences assigned without
+        # load_genetic_data have no fingerprint and are not cached
+        if self._sequence_hash is not None:
+            self._distance_cache = (self._sequence_hash, distance_df)
+
         return distance_df, None
 
     def build_transmission_network(self, distance_threshold=5, similarity_threshold=0.99):
@@ -462,56 +605,70 @@ class TransmissionNetworkAnalyzer:
         # Create NetworkX graph
         G = nx.Graph()
 
-        # Add nodes with metadata
-        for isolate_id in distances.index:
-            metadata_dict = self.metadata.loc[isolate_id].to_dict() if isolate_id in self.metadata.index else {}
-            G.add_node(isolate_id, **metadata_dict)
+        # Add nodes with metadata, looked up for all isolates at once
+        node_metadata = self._metadata_records(distances.index)
+        G.add_nodes_from(
+            (isolate_id, node_metadata.get(isolate_id, {})) for isolate_id in distances.index
+        )
 
-        # Add edges based on genetic distance
-        for i, isolate1 in enumerate(distances.index):
-            for j, isolate2 in enumerate(distances.columns):
-                if i < j:  # Avoid duplicate edges
-                    distance = distances.iloc[i, j]
+        # Add edges for pairs within transmission threshold (upper triangle avoids duplicates)
+        isolate_ids = distances.index.to_numpy()
+        distance_values = distances.to_numpy()
+        rows, cols = np.nonzero(np.triu(distance_values <= distance_threshold, k=1))
+        edge_distances = distance_values[rows, cols]
+        edge_pairs = list(zip(isolate_ids[rows], isolate_ids[cols]))
 
-                    # Create edge if distance within transmission threshold
-                    if distance <= distance_threshold:
-                        G.add_edge(isolate1, isolate2,
-                                 genetic_distance=distance,
-                                 transmission_likelihood=1 / (1 + distance))
+        G.add_weighted_edges_from(
+            ((u, v, d) for (u, v), d in zip(edge_pairs, edge_distances)),
+            weight='genetic_distance'
+        )
+        nx.set_edge_attributes(
+            G, dict(zip(edge_pairs, 1 / (1 + edge_distances))), 'transmission_likelihood'
+        )
 
         self.network = G
 
         print(f"✅ Built transmission network with {G.number_of_nodes()} nodes and {G.number_of_edges()} edges")
         return G, None
 
+    def _metadata_records(self, isolate_ids):
+        """Metadata rows as {isolate_id: {column: value}} for the isolates that have them"""
+
+        known = self.metadata.index.get_indexer(isolate_ids) >= 0
+        return self.metadata.loc[np.asarray(isolate_ids)[known]].to_dict(orient='index')
+
     def analyze_clusters(self, min_cluster_size=3):
         """Identify transmission clusters in the network"""
 
         if self.network is None:
             return None, "No transmission network available"
 
-        # Find connected components
-        clusters = []
-        for component in nx.connected_components(self.network):
-            if len(component) >= min_cluster_size:
-                isolates = list(component)
+        # Connected components of the sparse adjacency (compiled traversal)
+        n_components, labels = connected_components(self._transmission_matrix(), directed=False)
+        isolate_ids = np.array(list(self.network.nodes()), dtype=object)
+        component_sizes = np.bincount(labels, minlength=n_components)
 
+        # Node positions grouped by component label
+        members_by_component = np.split(
+            np.argsort(labels, kind='stable'), np.cumsum(component_sizes)[:-1]
+        )
+
+        # Metadata for every node in a single lookup
+        node_metadata = self._metadata_records(isolate_ids)
+
+        clusters = []
+        for members in members_by_component:
+            if len(members) >= min_cluster_size:
                 # Calculate cluster statistics
                 cluster_data = {
-                    'cluster_size': len(component),
-                    'isolates': isolates,
-                    'isolate_metadata': []
+                    'cluster_size': len(members),
+                    'isolates': isolate_ids[members].tolist(),
+                    'isolate_metadata': [
+                        node_metadata.get(isolate, {'cluster_type': 'Unknown'})
+                        for isolate in isolate_ids[members]
+                    ]
                 }
 
-                # Collect metadata for cluster members
-                for isolate in isolates:
-                    if isolate in self.metadata.index:
-                        metadata = self.metadata.loc[isolate].to_dict()
-                    else:
-                        metadata = {'cluster_type': 'Unknown'}
-
-                    cluster_data['isolate_metadata'].append(metadata)
-
                 clusters.append(cluster_data)
 
         # Sort by cluster size
@@ -525,53 +682,97 @@ class TransmissionNetworkAnalyzer:
         if self.network is None:
             return None, "No transmission network available"
 
-        # Calculate various centrality measures
-        degree_centrality = nx.degree_centrality(self.network)
-        betweenness_centrality = nx.betweenness_centrality(self.network)
-        closeness_centrality = nx.closeness_centrality(self.network)
+        isolate_ids = list(self.network.nodes())
+        n_nodes = len(isolate_ids)
+        adjacency = self._transmission_matrix()
+        scale = 1 / (n_nodes - 1) if n_nodes > 1 else 0.0
+
+        # Degree centrality from row counts (NetworkX scores a lone node as 1)
+        degree_centrality = np.diff(adjacency.indptr) * scale if n_nodes > 1 else np.ones(n_nodes)
+
+        # Closeness from hop distances (compiled BFS), matching NetworkX's
+        # Wasserman-Faust scaling for disconnected graphs
+        hops = shortest_path(adjacency, directed=False, unweighted=True)
+        reachable = np.isfinite(hops)
+        n_reachable = reachable.sum(axis=1) - 1
+        total_hops = np.where(reachable, hops, 0).sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            closeness_centrality = np.where(
+                total_hops > 0, n_reachable / total_hops * n_reachable * scale, 0.0
+            )
+
+        # Betweenness with igraph's C implementation when available
+        if ig is not None:
+            sources, targets = sparse.triu(adjacency).nonzero()
+            graph = ig.Graph(n=n_nodes, edges=list(zip(sources.tolist(), targets.tolist())))
+            pair_scale = 2 / ((n_nodes - 1) * (n_nodes - 2)) if n_nodes > 2 else 0.0
+            betweenness_centrality = np.asarray(graph.betweenness(directed=False)) * pair_scale
+        else:
+            betweenness = nx.betweenness_centrality(self.network)
+            betweenness_centrality = [betweenness[node] for node in isolate_ids]
 
         # Combine into DataFrame
         centrality_df = pd.DataFrame({
-            'isolate_id': list(self.network.nodes()),
-            'degree_centrality': [degree_centrality[node] for node in self.network.nodes()],
-            'betweenness_centrality': [betweenness_centrality[node] for node in self.network.nodes()],
-            'closeness_centrality': [closeness_centrality[node] for node in self.network.nodes()]
+            'isolate_id': isolate_ids,
+            'degree_centrality': degree_centrality,
+            'betweenness_centrality': betweenness_centrality,
+            'closeness_centrality': closeness_centrality
         })
 
         return centrality_df, None
 
+    def _transmission_matrix(self):
+        """CSR matrix of transmission likelihoods for the current network (cached)"""
+
+        if self._matrix_network is not self.network:
+            self._network_matrix = nx.to_scipy_sparse_array(
+                self.network, weight='transmission_likelihood', format='csr'
+            )
+            self._matrix_network = self.network
+
+        return self._network_matrix
+
     def predict_spread_patterns(self, initial_cases, time_steps=10):
         """Predict resistance spread patterns using network models"""
 
         if self.network is None:
             return None, "No transmission network available"
 
-        # Convert initial infected cases to set
-        infected = set(initial_cases)
-        susceptible = set(self.network.nodes()) - infected
+        node_ids = np.array(list(self.network.nodes()), dtype=object)
+        node_index = {node: i for i, node in enumerate(node_ids)}
+
+        if any(case not in node_index for case in initial_cases):
+            return None, "Initial cases must be isolates in the transmission network"
+
+        # Transmission likelihoods as a sparse adjacency matrix
+        transmission_matrix = self._transmission_matrix()
+
+        # Infection state as a boolean vector over network nodes
+        infected = np.zeros(len(node_ids), dtype=bool)
+        infected[[node_index[case] for case in initial_cases]] = True
 
-        spread_history = [list(infected)]
+        # One boolean snapshot row per time step; node lists are built at the end
+        history = np.zeros((time_steps + 1, len(node_ids)), dtype=bool)
+        history[0] = infected
 
         for step in range(time_steps):
-            new_infections = set()
+            # Edges leaving currently infected nodes
+            contacts = transmission_matrix[np.flatnonzero(infected)]
+            targets = contacts.indices
+            infection_prob = contacts.data
 
-            # For each infected node
-            for infected_node in infected:
-                # Get neighbors (transmission contacts)
-                neighbors = set(self.network.neighbors(infected_node))
+            # Keep only contacts that are still susceptible
+            susceptible = ~infected[targets]
+            targets = targets[susceptible]
+            infection_prob = infection_prob[susceptible]
 
-                # Remove already infected neighbors
-                susceptible_neighbors = neighbors - infected
+            # Probabilistic infection (simplified model), one draw per contact
+            transmitted = np.random.random(len(targets)) < infection_prob
+            infected[targets[transmitted]] = True
 
-                # Probabilistic infection (simplified model)
-                for neighbor in susceptible_neighbors:
-                    infection_prob = self.network.edges[(infected_node, neighbor)]['transmission_likelihood']
-                    if np.random.random() < infection_prob:
-                        new_infections.add(neighbor)
+            history[step + 1] = infected
 
-            # Update infected set
-            infected.update(new_infections)
-            spread_history.append(list(infected))
+        spread_history = [node_ids[snapshot].tolist() for snapshot in history]
 
         return spread_history, None
 
@@ -584,34 +785,46 @@ class AMRResistancePredictor:
     def __init__(self):
         """Initialize resistance prediction model"""
         self.model = None
-        self.feature_scaler = StandardScaler()
-        self.label_encoders = {}
+        self.category_index = {}
+        self.categorical_features = []
         self.feature_importance = None
 
+    @property
+    def category_maps(self):
+        """Code -> category lookup per encoded column, derived from category_index"""
+        return {col: dict(enumerate(categories)) for col, categories in self.category_index.items()}
+
     def prepare_training_data(self, surveillance_data):
         """Prepare surveillance data for ML training"""
 
         # Create features
         features = []
 
-        # Encode categorical features
+        # Encode categorical features as category codes
+        self.categorical_features = []
         for col in ['pathogen', 'antimicrobial', 'country_name']:
             if col in surveillance_data.columns:
-                le = LabelEncoder()
-                surveillance_data[f'{col}_encoded'] = le.fit_transform(surveillance_data[col])
-                self.label_encoders[col] = le
+                categorical = surveillance_data[col].astype('category')
+                surveillance_data[f'{col}_encoded'] = categorical.cat.codes.astype(np.int32)
+                self.category_index[col] = categorical.cat.categories
                 features.append(f'{col}_encoded')
 
+                # Native categorical splits support up to max_bins (255) categories
+                if len(categorical.cat.categories) <= 255:
+                    self.categorical_features.append(f'{col}_encoded')
+
         # Numeric features
         numeric_features = ['total_isolates', 'reporting_year', 'resistance_percentage']
         features.extend(numeric_features)
 
         # Rolling averages (temporal patterns)
-        surveillance_data = surveillance_data.sort_values(['pathogen', 'antimicrobial', 'reporting_year'])
+        surveillance_data = surveillance_data.sort_values(
+            ['pathogen', 'antimicrobial', 'reporting_year'], kind='stable'
+        )
 
-        # Target variable: Future resistance rate
+        # Target variable: Future resistance rate (rows are already grouped by the sort)
         surveillance_data['future_resistance'] = surveillance_data.groupby(
-            ['pathogen', 'antimicrobial']
+            ['pathogen', 'antimicrobial'], sort=False, observed=True
         )['resistance_percentage'].shift(-1)
 
         # Remove rows without future values
@@ -622,7 +835,7 @@ class AMRResistancePredictor:
 
         return X, y, train_data
 
-    def train_prediction_model(self, X, y, model_type='random_forest'):
+    def train_prediction_model(self, X, y, model_type='hist_gradient_boosting'):
         """Train resistance prediction model"""
 
         # Train-test split
@@ -630,28 +843,50 @@ class AMRResistancePredictor:
             X, y, test_size=0.2, random_state=42
         )
 
-        # Scale features
-        X_train_scaled = self.feature_scaler.fit_transform(X_train)
-        X_test_scaled = self.feature_scaler.transform(X_test)
+        # Tree models are scale-invariant: train on contiguous float32 features
+        X_train_values = np.ascontiguousarray(X_train.values, dtype=np.float32)
+        X_test_values = np.ascontiguousarray(X_test.values, dtype=np.float32)
+
+        categorical_mask = [feature in self.categorical_features for feature in X.columns]
+        fit_params = {}
 
         # Choose and train model
-        if model_type == 'random_forest':
+        if model_type == 'hist_gradient_boosting':
+            model = HistGradientBoostingRegressor(
+                max_iter=200,
+                max_bins=255,
+                categorical_features=categorical_mask if any(categorical_mask) else None,
+                early_stopping=True,
+                random_state=42
+            )
+        elif model_type == 'random_forest':
             model = RandomForestRegressor(
                 n_estimators=100,
                 random_state=42,
                 n_jobs=-1
             )
         elif model_type == 'gradient_boosting':
-            model = GradientBoostingRegressor(
-                n_estimators=100,
+            if lgb is None:
+                return None, "LightGBM is required for the 'gradient_boosting' model"
+
+            # LightGBM bins features into 8-bit histograms and splits
+            # categorical codes natively
+            model = lgb.LGBMRegressor(
+                n_estimators=200,
+                num_leaves=63,
+                max_bin=255,
                 random_state=42,
-                max_depth=6
+                n_jobs=-1,
+                verbose=-1
             )
+            fit_params['categorical_feature'] = [
+                i for i, is_categorical in enumerate(categorical_mask) if is_categorical
+            ]
 
-        model.fit(X_train_scaled, y_train)
+        model.fit(X_train_values, y_train, **fit_params)
 
         # Evaluate model
-        y_pred = model.predict(X_test_scaled)
+        y_pred = model.predict(X_test_values)
         mse = mean_squared_error(y_test, y_pred)
         r2 = r2_score(y_test, y_pred)
 
@@ -661,9 +896,15 @@ class AMRResistancePredictor:
         print(f"   Training samples: {len(X_train)}")
         print(f"   Test samples: {len(X_test)}")
 
-        # Store feature importance
+        # Store feature importance (permutation importance on the test set
+        # for models without impurity-based importances)
         if hasattr(model, 'feature_importances_'):
-            self.feature_importance = dict(zip(X.columns, model.feature_importances_))
+            importances = model.feature_importances_
+        else:
+            importances = permutation_importance(
+                model, X_test_values, y_test, n_repeats=5, random_state=42, n_jobs=-1
+            ).importances_mean
+        self.feature_importance = dict(zip(X.columns, importances))
 
         self.model = model
 
@@ -682,30 +923,27 @@ class AMRResistancePredictor:
         # Prepare new data (encode categorical features)
         processed_data = new_data.copy()
 
-        for col in ['pathogen', 'antimicrobial', 'country_name']:
-            if col in processed_data.columns and col in self.label_encoders:
-                le = self.label_encoders[col]
-                # Handle unseen categories
-                processed_data[f'{col}_encoded'] = processed_data[col].apply(
-                    lambda x: le.transform([x])[0] if x in le.classes_ else -1
-                )
+        for col, categories in self.category_index.items():
+            if col in processed_data.columns:
+                # Hashed lookup against the training categories; unseen values
+                # get code -1 (treated as missing by HistGradientBoosting)
+                processed_data[f'{col}_encoded'] = categories.get_indexer(
+                    processed_data[col]
+                ).astype(np.int32)
 
         # Select features (same as training)
         features = []
-        for encoder_name in self.label_encoders.keys():
-            features.append(f'{encoder_name}_encoded')
+        for col in self.category_index.keys():
+            features.append(f'{col}_encoded')
 
         numeric_features = ['total_isolates', 'reporting_year', 'resistance_percentage']
         features.extend(numeric_features)
 
         available_features = [f for f in features if f in processed_data.columns]
-        X = processed_data[available_features]
-
-        # Scale features
-        X_scaled = self.feature_scaler.transform(X)
+        X = np.ascontiguousarray(processed_data[available_features].values, dtype=np.float32)
 
         # Make predictions
-        predictions = self.model.predict(X_scaled)
+        predictions = self.model.predict(X)
 
         # Add predictions to original data
         result_data = new_data.copy()
@@ -735,38 +973,138 @@ class AMRResistancePredictor:
 
 
 # Utility functions for data processing
+def _hamming_distance_matrix(encoded, max_block_bytes=64 * 1024 * 1024):
+    """Pairwise Hamming distances between the rows of a 2-D uint8 array"""
+
+    n_rows, length = encoded.shape
+    distances = np.zeros((n_rows, n_rows), dtype=np.int32)
+
+    # Compare in row blocks so the broadcast temporary stays bounded
+    block_size = max(1, max_block_bytes // max(1, n_rows * length))
+
+    for start in range(0, n_rows, block_size):
+        block = encoded[start:start + block_size]
+        distances[start:start + block_size] = (
+            block[:, None, :] != encoded[None, :, :]
+        ).sum(axis=-1, dtype=np.int32)
+
+    return distances
+
+# 2-bit codes for A/C/G/T; any other symbol maps to 255
+_NUCLEOTIDE_CODES = np.full(256, 255, dtype=np.uint8)
+for _code, _base in enumerate(b'ACGT'):
+    _NUCLEOTIDE_CODES[_base] = _code
+
+def _pack_nucleotides(encoded):
+    """
+    Pack uint8 A/C/G/T rows into 2-bit codes, 32 bases per uint64 word.
+    Returns None if any sequence contains other symbols (N, gaps, ...).
+    """
+    codes = _NUCLEOTIDE_CODES[encoded]
+    if (codes == 255).any():
+        return None
+
+    n_rows, length = codes.shape
+    n_words = -(-length // 32)
+
+    # Zero padding XORs to zero, so it never adds to the distance
+    padded = np.zeros((n_rows, n_words * 32), dtype=np.uint8)
+    padded[:, :length] = codes
+
+    quads = padded.reshape(n_rows, -1, 4)
+    packed = quads[..., 0] | (quads[..., 1] << 2) | (quads[..., 2] << 4) | (quads[..., 3] << 6)
+
+    return np.ascontiguousarray(packed).view(np.uint64)
+
+if njit is not None:
+    _EVEN_BITS = np.uint64(0x5555555555555555)
+    _BIT_PAIRS = np.uint64(0x3333333333333333)
+    _NIBBLES = np.uint64(0x0F0F0F0F0F0F0F0F)
+    _BYTE_SUM = np.uint64(0x0101010101010101)
+
+    @njit(parallel=True, cache=True)
+    def _hamming_packed(packed):
+        """Pairwise Hamming distances between rows of 2-bit packed sequences"""
+
+        n_rows, n_words = packed.shape
+        distances = np.zeros((n_rows, n_rows), dtype=np.int32)
+
+        for i in prange(n_rows):
+            for j in range(i + 1, n_rows):
+                d = np.uint64(0)
+                for k in range(n_words):
+                    # One set bit per differing base, then SWAR popcount
+                    x = packed[i, k] ^ packed[j, k]
+                    x = (x | (x >> np.uint64(1))) & _EVEN_BITS
+                    x = (x & _BIT_PAIRS) + ((x >> np.uint64(2)) & _BIT_PAIRS)
+                    x = (x + (x >> np.uint64(4))) & _NIBBLES
+                    d += (x * _BYTE_SUM) >> np.uint64(56)
+                distances[i, j] = d
+                distances[j, i] = d
+
+        return distances
+else:
+    _hamming_packed = None
+
+if njit is not None:
+    @vectorize(['float32(float32, float32, float32, float32)'], cache=True)
+    def combine_resistance_rate(base, region_mod, year_mod, noise):
+        """Sum resistance rate components and clip to 2-95% in one fused pass"""
+        rate = base + region_mod + year_mod + noise
+        return 2.0 if rate < 2 else (95.0 if rate > 95 else rate)
+else:
+    def combine_resistance_rate(base, region_mod, year_mod, noise):
+        """Sum resistance rate components and clip to 2-95%"""
+        return np.clip(base + region_mod + year_mod + noise, 2, 95).astype(np.float32)
+
 def calculate_eucast_interpretation(mic_value, breakpoint):
     """
     Determine EUCAST interpretation for MIC value against breakpoint
     """
-    if mic_value <= breakpoint['susceptible']:
-        return 'S'  # Susceptible
-    elif mic_value > breakpoint['resistant']:
-        return 'R'  # Resistant
-    else:
-        return 'I'  # Intermediate
+    return str(calculate_eucast_interpretation_vec(
+        mic_value, breakpoint['susceptible'], breakpoint['resistant']
+    ))
+
+def calculate_eucast_interpretation_vec(mic_values, susceptible, resistant):
+    """
+    Determine EUCAST interpretations for an array of MIC values.
+    Breakpoints may be scalars or arrays aligned with mic_values
+    (e.g. per-drug breakpoints joined onto the MIC table).
+    """
+    mic_values = np.asarray(mic_values)
+
+    return np.select(
+        [mic_values <= susceptible, mic_values > resistant],
+        ['S', 'R'],  # Susceptible, Resistant
+        default='I'  # Intermediate
+    )
+
+# Standardized column -> (raw lab columns in order of preference, default value)
+_RESISTANCE_DATA_COLUMNS = {
+    'pathogen': (('organism', 'pathogen'), 'Unknown'),
+    'antimicrobial': (('antibiotic', 'antimicrobial'), 'Unknown'),
+    'mic_value': (('mic', 'mic_value'), None),
+    'interpretation': (('interpretation', 'susceptibility'), None),
+    'sample_date': (('date', 'collection_date'), None),
+    'hospital_id': (('hospital', 'facility'), None),
+    'patient_age': (('age',), None),
+    'ward_type': (('ward', 'department'), None),
+    'empirical_regimen': (('treatment_before_culture',), None)
+}
 
 def format_resistance_data(data):
     """
     Format raw lab data to standardized AMR format
     """
-    formatted_data = []
-
-    for _, row in data.iterrows():
-        formatted_entry = {
-            'pathogen': row.get('organism', row.get('pathogen', 'Unknown')),
-            'antimicrobial': row.get('antibiotic', row.get('antimicrobial', 'Unknown')),
-            'mic_value': row.get('mic', row.get('mic_value')),
-            'interpretation': row.get('interpretation', row.get('susceptibility')),
-            'sample_date': row.get('date', row.get('collection_date')),
-            'hospital_id': row.get('hospital', row.get('facility')),
-            'patient_age': row.get('age'),
-            'ward_type': row.get('ward', row.get('department')),
-            'empirical_regimen': row.get('treatment_before_culture')
-        }
-        formatted_data.append(formatted_entry)
+    data = data.reset_index(drop=True)
+    formatted_data = pd.DataFrame(index=data.index)
+
+    # Take each field from the first raw column present, else the default
+    for target, (sources, default) in _RESISTANCE_DATA_COLUMNS.items():
+        source = next((col for col in sources if col in data.columns), None)
+        formatted_data[target] = data[source] if source is not None else default
 
-    return pd.DataFrame(formatted_data)
+    return formatted_data
 
 
 # Export main classes for easy importing
@@ -776,6 +1114,7 @@ __all__ = [
     'TransmissionNetworkAnalyzer',
     'AMRResistancePredictor',
     'calculate_eucast_interpretation',
+    'calculate_eucast_interpretation_vec',
     'format_resistance_data'
 ]
 
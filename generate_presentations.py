@@ -12,7 +12,7 @@ Features:
 - Creates presentation metadata files
 
 Usage:
-    python generate_presentations.py
+    python generate_presentations.py [--parallel N]
 
 Dependencies:
 - @marp-team/marp-cli (global npm package)
@@ -21,39 +21,109 @@ Dependencies:
 Author: Antimicrobial Resistance Workshop Development Team
 """
 
+import argparse
+import asyncio
+import hashlib
 import subprocess
 import os
+import shutil
 import sys
 from pathlib import Path
 import json
 from datetime import datetime
+from functools import lru_cache
+from itertools import islice
 
-def run_command(cmd, cwd=None):
-    """Run shell command and return success status"""
-    try:
-        result = subprocess.run(cmd, shell=True, cwd=cwd,
-                              capture_output=True, text=True,
-                              timeout=300)  # 5 minute timeout
+try:
+    import orjson
+except ImportError:  # orjson is optional; the manifest falls back to the json module
+    orjson = None
+
+# Output locations, shared by every conversion
+PRESENTATIONS_DIR = Path("Presentations")
+PPTX_DIR = PRESENTATIONS_DIR / "PPTX"
+PDF_DIR = PRESENTATIONS_DIR / "PDF"
+HTML_DIR = PRESENTATIONS_DIR / "HTML"
+
+# Generation date stamped into every presentation footer
+RUN_TIMESTAMP = datetime.now().strftime('%Y-%m-%d')
 
-        if result.returncode == 0:
+# Seconds allowed per file and output format; a batch gets one allowance per
+# round of --parallel conversions
+FORMAT_TIMEOUTS = {"html": 60, "pptx": 180, "pdf": 300}
+
+# Output returned by run_command/run_command_async when the process was killed on timeout
+COMMAND_TIMED_OUT = "Command timed out"
+
+def run_command(argv, cwd=None, timeout=300):
+    """Run a command (argument list, no shell) and return success status"""
+    cmd = " ".join(argv)
+    try:
+        # Resolve the executable on PATH (also finds npm's marp.cmd shim on Windows)
+        argv = [shutil.which(argv[0]) or argv[0]] + list(argv[1:])
+        process = subprocess.Popen(argv, cwd=cwd,
+                                   stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                   bufsize=1, text=True)
+
+        try:
+            stdout, stderr = process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.communicate()
+            raise
+
+        if process.returncode == 0:
             print(f"✅ Command succeeded: {cmd}")
-            return True, result.stdout
+            return True, stdout
         else:
             print(f"❌ Command failed: {cmd}")
-            print(f"Error output: {result.stderr}")
-            return False, result.stderr
+            print(f"Error output: {stderr}")
+            return False, stderr
 
     except subprocess.TimeoutExpired:
         print(f"⏰ Command timed out: {cmd}")
-        return False, "Command timed out"
+        return False, COMMAND_TIMED_OUT
+    except Exception as e:
+        print(f"💥 Command error: {cmd}")
+        print(f"Exception: {str(e)}")
+        return False, str(e)
+
+async def run_command_async(argv, cwd=None, timeout=300):
+    """Run a command (argument list, no shell) on the event loop and return success status"""
+    cmd = " ".join(argv)
+    try:
+        process = await asyncio.create_subprocess_exec(
+            shutil.which(argv[0]) or argv[0], *argv[1:], cwd=cwd,
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.communicate()
+            raise
+
+        if process.returncode == 0:
+            print(f"✅ Command succeeded: {cmd}")
+            return True, stdout.decode(errors='replace')
+        else:
+            print(f"❌ Command failed: {cmd}")
+            print(f"Error output: {stderr.decode(errors='replace')}")
+            return False, stderr.decode(errors='replace')
+
+    except asyncio.TimeoutError:
+        print(f"⏰ Command timed out: {cmd}")
+        return False, COMMAND_TIMED_OUT
     except Exception as e:
         print(f"💥 Command error: {cmd}")
         print(f"Exception: {str(e)}")
         return False, str(e)
 
+@lru_cache(maxsize=1)
 def check_marp_installation():
     """Verify Marp CLI installation"""
-    success, output = run_command("marp --version")
+    success, output = run_command(["marp", "--version"])
     if success:
         print(f"📦 Marp CLI version: {output.strip()}")
         return True
@@ -62,34 +132,132 @@ def check_marp_installation():
         print("💡 Alternative: Install via package manager or download from GitHub")
         return False
 
-def convert_presentation(input_file, output_file, theme="default"):
-    """Convert markdown to PowerPoint using Marp"""
+# Marp output flag, destination directory and file name suffix per output format
+# (HTML is Marp's default output, so it needs no flag)
+OUTPUT_FORMATS = {
+    "pptx": ("--pptx", PPTX_DIR, ".pptx"),
+    "pdf": ("--pdf", PDF_DIR, "_handout.pdf"),
+    "html": ("", HTML_DIR, ".html"),
+}
 
-    # Marp command with custom theme and options
-    cmd = f'marp --theme {theme} --allow-local-files --pptx "{input_file}" -o "{output_file}"'
+def output_path(md_file, output_format):
+    """Destination of a presentation's output in the given format"""
 
-    success, output = run_command(cmd)
+    _, output_dir, suffix = OUTPUT_FORMATS[output_format]
+    base_name = md_file.stem.replace('_presentation', '')
+    return output_dir / f"{base_name}{suffix}"
 
-    if success:
-        print(f"🎯 Generated PowerPoint: {output_file}")
-        return True, output
-    else:
-        print(f"❌ Failed to generate PowerPoint: {output_file}")
-        return False, output
+def create_output_dirs():
+    """Create the PPTX, PDF and HTML output directories"""
 
-def generate_handout(input_file, output_file):
-    """Generate PDF handout from markdown"""
+    for output_dir in (PPTX_DIR, PDF_DIR, HTML_DIR):
+        os.makedirs(output_dir, exist_ok=True)
+        print(f"📁 Created directory: {output_dir}")
 
-    cmd = f'marp --allow-local-files --pdf "{input_file}" -o "{output_file}"'
+def write_if_changed(path, content):
+    """Write text or bytes to path unless the file already holds identical content"""
 
-    success, output = run_command(cmd)
+    data = content.encode('utf-8') if isinstance(content, str) else content
 
-    if success:
-        print(f"📄 Generated PDF handout: {output_file}")
-        return True, output
-    else:
-        print(f"❌ Failed to generate PDF: {output_file}")
-        return False, output
+    if path.exists() and hashlib.blake2b(path.read_bytes()).digest() == hashlib.blake2b(data).digest():
+        return False
+
+    # Written as bytes so line endings match what was hashed on every platform
+    path.write_bytes(data)
+    return True
+
+def is_up_to_date(output_file, md_file, theme_path=None):
+    """Check whether an output is newer than its markdown source and the theme"""
+
+    if not output_file.exists():
+        return False
+
+    sources = [md_file, theme_path] if theme_path else [md_file]
+    return output_file.stat().st_mtime >= max(source.stat().st_mtime for source in sources)
+
+async def convert_batch(md_files, output_format, theme=None, parallel=5, theme_path=None):
+    """Convert presentations to one output format in a single Marp run"""
+
+    flag, output_dir, suffix = OUTPUT_FORMATS[output_format]
+    extension = suffix.rsplit(".", 1)[1]
+
+    timed_out = []
+    run_timed_out = False
+
+    # Outputs newer than both their source and the theme are kept as they are
+    stale_files = [
+        md_file for md_file in md_files
+        if not is_up_to_date(output_path(md_file, output_format), md_file, theme_path)
+    ]
+    converted = [md_file for md_file in md_files if md_file not in stale_files]
+
+    if converted:
+        print(f"⏭️ Skipping {len(converted)} up-to-date {output_format.upper()} files")
+
+    if stale_files:
+        # Marp converts every file with one Chromium instance, writing each
+        # output next to its markdown source. Stale files are listed explicitly
+        # rather than passed as --input-dir, which would also convert
+        # Presentations/README.md and every up-to-date deck
+        argv = ["marp", "--parallel", str(parallel)]
+        if theme:
+            argv += ["--theme", theme]
+        argv.append("--allow-local-files")
+        if flag:
+            argv.append(flag)
+        argv += [str(md_file) for md_file in stale_files]
+
+        # Clear leftovers from earlier runs so only files this run writes count as converted
+        for md_file in stale_files:
+            md_file.with_suffix(f".{extension}").unlink(missing_ok=True)
+
+        rounds = -(-len(stale_files) // max(parallel, 1))
+        timeout = FORMAT_TIMEOUTS[output_format] * rounds
+
+        _, output = await run_command_async(argv, timeout=timeout)
+
+        run_timed_out = output is COMMAND_TIMED_OUT
+
+    # Move each generated file into the format's output directory
+    for md_file in stale_files:
+        generated = md_file.with_suffix(f".{extension}")
+        if generated.exists():
+            generated.replace(output_path(md_file, output_format))
+            converted.append(md_file)
+        elif run_timed_out:
+            print(f"⏰ Timed out generating {output_format.upper()}: {md_file.name}")
+            timed_out.append(md_file)
+        else:
+            print(f"❌ Failed to generate {output_format.upper()}: {md_file.name}")
+
+    print(f"🎯 {len(converted)} / {len(md_files)} {output_format.upper()} files ready in {output_dir}")
+    return converted, timed_out
+
+async def convert_all(md_files, theme_path, parallel=5):
+    """Run the per-format Marp batches concurrently and return (converted, timed out) files per format"""
+
+    # Marp emits one format per invocation, so the batches run side by side and
+    # their Node/Chromium startups overlap; outputs never collide because each
+    # format writes its own extension. At most one marp process runs per output
+    # format, so no further concurrency limit is needed
+    batches = await asyncio.gather(*(
+        convert_batch(
+            md_files, output_format,
+            theme="amr-workshop-theme" if output_format == "pptx" else None,
+            parallel=parallel,
+            theme_path=theme_path
+        )
+        for output_format in OUTPUT_FORMATS
+    ), return_exceptions=True)
+
+    converted = {}
+    for output_format, batch in zip(OUTPUT_FORMATS, batches):
+        if isinstance(batch, Exception):
+            print(f"💥 {output_format.upper()} conversion error: {batch}")
+            batch = [], []
+        converted[output_format] = batch
+
+    return converted
 
 def create_amr_theme():
     """Create custom Marp theme for Antimicrobial Resistance Workshop"""
@@ -390,17 +558,40 @@ section.key-takeaways {
 """
 
     theme_file = "amr-workshop-theme.css"
-    theme_path = Path("Presentations") / theme_file
-
-    with open(theme_path, 'w', encoding='utf-8') as f:
-        f.write(theme_css)
+    theme_path = PRESENTATIONS_DIR / theme_file
 
-    print(f"🎨 Created AMR workshop theme: {theme_file}")
+    # An unchanged theme keeps its mtime, so existing outputs stay up to date
+    if write_if_changed(theme_path, theme_css):
+        print(f"🎨 Created AMR workshop theme: {theme_file}")
+    else:
+        print(f"🎨 AMR workshop theme unchanged: {theme_file}")
     return theme_file
 
-def main():
+def positive_int(value):
+    """argparse type for counts that must be at least 1"""
+
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
+def parse_args(argv=None):
+    """Parse command line options"""
+
+    parser = argparse.ArgumentParser(
+        description="Convert AMR workshop presentations to PPTX, PDF and HTML with Marp CLI"
+    )
+    parser.add_argument(
+        "-P", "--parallel", type=positive_int, default=5, metavar="N",
+        help="number of files Marp converts concurrently (default: 5)"
+    )
+    return parser.parse_args(argv)
+
+def main(argv=None):
     """Main presentation generation workflow"""
 
+    args = parse_args(argv)
+
     print("🦠 Antimicrobial Resistance Workshop Presentation Generator")
     print("="*60)
 
@@ -409,17 +600,11 @@ def main():
         sys.exit(1)
 
     # Create output directories
-    output_dirs = ["Presentations/PPTX", "Presentations/PDF", "Presentations/HTML"]
-    for dir_name in output_dirs:
-        Path(dir_name).mkdir(parents=True, exist_ok=True)
-        print(f"📁 Created directory: {dir_name}")
+    create_output_dirs()
 
     # Create custom AMR theme
     theme_file = create_amr_theme()
 
-    # Find all presentation files
-    presentations_dir = Path("Presentations")
-
     # Create placeholder presentations if they don't exist
     session_files = list(Path("Sessions").glob("session*.md"))
     presentation_files = []
@@ -429,7 +614,7 @@ def main():
 
         for session_file in session_files:
             session_name = session_file.stem
-            presentation_file = presentations_dir / f"{session_name.replace('session', 'session')}_presentation.md"
+            presentation_file = PRESENTATIONS_DIR / f"{session_name.replace('session', 'session')}_presentation.md"
 
             if not presentation_file.exists():
                 # Create a comprehensive presentation structure based on session content
@@ -439,7 +624,7 @@ def main():
             presentation_files.append(presentation_file)
     else:
         # Fallback: look for existing presentation files
-        presentation_files = list(presentations_dir.glob("session*_presentation.md"))
+        presentation_files = list(PRESENTATIONS_DIR.glob("session*_presentation.md"))
 
     if not presentation_files:
         print("⚠️ No presentation files found or created")
@@ -453,35 +638,27 @@ def main():
         "pptx_success": 0,
         "pptx_failed": 0,
         "pdf_success": 0,
-        "pdf_failed": 0
+        "pdf_failed": 0,
+        "html_success": 0,
+        "html_failed": 0,
+        "pptx_timed_out": 0,
+        "pdf_timed_out": 0,
+        "html_timed_out": 0
     }
 
-    # Process each presentation
-    for md_file in presentation_files:
-        print(f"\n🚀 Processing: {md_file.name}")
+    # One batched Marp run per output format; PowerPoint uses amr-workshop-theme,
+    # the PDF handout and HTML version use the defaults
+    print(f"\n🚀 Converting {len(presentation_files)} presentations ({args.parallel} in parallel)")
 
-        base_name = md_file.stem.replace('_presentation', '')
+    converted_by_format = asyncio.run(
+        convert_all(presentation_files, PRESENTATIONS_DIR / theme_file, parallel=args.parallel)
+    )
 
-        # Convert to PowerPoint - use amr-workshop-theme
-        pptx_file = Path("Presentations/PPTX") / f"{base_name}.pptx"
-        success, _ = convert_presentation(str(md_file), str(pptx_file), theme="amr-workshop-theme")
-        if success:
-            results["pptx_success"] += 1
-        else:
-            results["pptx_failed"] += 1
-
-        # Generate PDF handout
-        pdf_file = Path("Presentations/PDF") / f"{base_name}_handout.pdf"
-        success, _ = generate_handout(str(md_file), str(pdf_file))
-        if success:
-            results["pdf_success"] += 1
-        else:
-            results["pdf_failed"] += 1
-
-        # Optional: Generate HTML version
-        html_file = Path("Presentations/HTML") / f"{base_name}.html"
-        cmd = f'marp --allow-local-files "{md_file}" -o "{html_file}"'
-        run_command(cmd)
+    # Timeouts are counted apart from other failures
+    for output_format, (converted, timed_out) in converted_by_format.items():
+        results[f"{output_format}_success"] = len(converted)
+        results[f"{output_format}_timed_out"] = len(timed_out)
+        results[f"{output_format}_failed"] = len(presentation_files) - len(converted) - len(timed_out)
 
     # Generate summary report
     print("\n" + "="*60)
@@ -489,15 +666,17 @@ def main():
     print("="*60)
 
     print(f"✅ PowerPoint files generated: {results['pptx_success']} / {len(presentation_files)}")
-    print(f"❌ PowerPoint failures: {results['pptx_failed']}")
+    print(f"❌ PowerPoint failures: {results['pptx_failed']} (+{results['pptx_timed_out']} timed out)")
     print(f"✅ PDF handouts generated: {results['pdf_success']} / {len(presentation_files)}")
-    print(f"❌ PDF failures: {results['pdf_failed']}")
+    print(f"❌ PDF failures: {results['pdf_failed']} (+{results['pdf_timed_out']} timed out)")
+    print(f"✅ HTML versions generated: {results['html_success']} / {len(presentation_files)}")
+    print(f"❌ HTML failures: {results['html_failed']} (+{results['html_timed_out']} timed out)")
 
     total_possible = len(presentation_files) * 2  # PPTX + PDF per presentation
     total_successful = results['pptx_success'] + results['pdf_success']
     success_rate = (total_successful / total_possible * 100) if total_possible > 0 else 0
 
-    print(".1f")
+    print(f"📈 Overall success rate: {success_rate:.1f}%")
     print(f"📁 Files saved in: Presentations/[PPTX/PDF/HTML]/")
 
     if results['pptx_success'] >= len(presentation_files) * 0.8:  # 80% success rate
@@ -505,39 +684,29 @@ def main():
         print("💡 Presentations include custom AMR-branded theme")
         print("📈 Total workshop materials: Sessions + Presentations + Handouts")
     else:
-        print(".1f"        print("🔍 Check terminal output above for specific errors")
+        print(f"\n⚠️ Only {results['pptx_success'] / len(presentation_files) * 100:.1f}% of PowerPoint conversions succeeded")
+        print("🔍 Check terminal output above for specific errors")
 
     # Create comprehensive manifest
     create_deployment_manifest(results, presentation_files)
 
     print("\n📋 Ready for workshop delivery!")
     print("🎯 AMR Workshop complete package:")
-    print(".0f"    print("   • Custom AMR-branded PowerPoint theme")
+    print(f"   • {len(presentation_files)} session presentations")
+    print("   • Custom AMR-branded PowerPoint theme")
     print("   • PDF handouts for participants")
     print("   • HTML web versions for online delivery")
-    print("   • Complete deployment manifest"
+    print("   • Complete deployment manifest")
 
 def create_presentation_from_session(session_file, presentation_file):
     """Create a Marp presentation from session markdown content"""
 
+    # Only the first 50 lines are inspected, so stop reading there
     with open(session_file, 'r', encoding='utf-8') as f:
-        session_content = f.read()
-
-    # Extract key information from session
-    lines = session_content.split('\n')
-    title = ""
-    objectives = []
-    key_concepts = []
-
-    for line in lines[:50]:  # Check first 50 lines
-        if line.startswith('# '):
-            title = line[2:].strip()
-        elif 'learning objectives' in line.lower():
-            # Find objectives section
-            pass
-        elif '**Learning Objectives**' in line:
-            # Extract objectives
-            pass
+        lines = list(islice(f, 50))
+
+    # Extract the session title from the first top-level heading
+    title = next((line[2:].strip() for line in lines if line.startswith('# ')), "")
 
     # Create presentation structure
     presentation_content = f"""---
@@ -546,7 +715,7 @@ description: AMR Workshop Presentation
 theme: amr-workshop-theme
 paginate: true
 header: Antimicrobial Resistance Workshop
-footer: 🦠 AMR Workshop | Generated {datetime.now().strftime('%Y-%m-%d')}
+footer: 🦠 AMR Workshop | Generated {RUN_TIMESTAMP}
 ---
 
 <!-- _class: learning-objectives -->
@@ -723,8 +892,8 @@ def create_deployment_manifest(results, presentation_files):
         "presentations": {
             "pptx_files_generated": results['pptx_success'],
             "pdf_handouts_generated": results['pdf_success'],
-            "html_versions_generated": len(presentation_files),
-            "total_files": results['pptx_success'] + results['pdf_success'] + len(presentation_files),
+            "html_versions_generated": results['html_success'],
+            "total_files": results['pptx_success'] + results['pdf_success'] + results['html_success'],
             "theme": "amr-workshop-theme.css",
             "generator": "@marp-team/marp-cli"
         },
@@ -748,11 +917,15 @@ def create_deployment_manifest(results, presentation_files):
         }
     }
 
-    with open("Presentations/deployment_manifest.json", 'w', encoding='utf-8') as f:
-        json.dump(manifest, f, indent=2)
+    # orjson's native encoder when installed, otherwise the standard library
+    if orjson is not None:
+        manifest_json = orjson.dumps(manifest, option=orjson.OPT_INDENT_2)
+    else:
+        manifest_json = json.dumps(manifest, indent=2)
+
+    write_if_changed(PRESENTATIONS_DIR / "deployment_manifest.json", manifest_json)
 
-    with open("Presentations/README.md", 'w', encoding='utf-8') as f:
-        f.write("""# AMR Workshop Presentations
+    write_if_changed(PRESENTATIONS_DIR / "README.md", """# AMR Workshop Presentations
 
 ## Generated Materials
 
@@ -0,0 +1,72 @@
+"""Regression tests for Scripts/amr_surveillance_models.py"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from Scripts.amr_surveillance_models import AMRSurveillanceAnalyzer, TransmissionNetworkAnalyzer
+
+
+def test_resistance_trend_with_large_yearly_isolate_totals(tmp_path):
+    """Per-year isolate totals above the int16 range must not wrap the standard error"""
+
+    rng = np.random.default_rng(0)
+    rows = []
+    for year in range(2016, 2020):
+        for country in ['India', 'Brazil', 'Kenya', 'Germany']:
+            rows.append({
+                'organism': 'Escherichia coli',
+                'antibiotic': 'Ciprofloxacin',
+                'resistance_rate': round(float(rng.uniform(20, 60)), 1),
+                'country': country,
+                'year': year,
+                'sample_size': int(rng.integers(130, 400))
+            })
+    raw = pd.DataFrame(rows)
+    data_path = tmp_path / 'glass.csv'
+    raw.to_csv(data_path, index=False)
+
+    analyzer = AMRSurveillanceAnalyzer()
+    assert analyzer.load_glass_data(data_path)
+
+    trends, error = analyzer.calculate_resistance_trend('Escherichia coli', 'Ciprofloxacin')
+    assert error is None
+
+    # Reference values computed in float64 straight from the CSV
+    n = raw['sample_size'].astype(np.float64)
+    r = raw['resistance_rate']
+    grouped = raw.assign(_rn=r * n, _var=n * r * (100 - r)).groupby('year')
+    totals = grouped['sample_size'].sum()
+    expected_se = np.sqrt(grouped['_var'].sum()) / (totals * 100)
+
+    assert (totals > 327).all()
+    np.testing.assert_array_equal(trends['sample_size'], totals.values)
+    np.testing.assert_allclose(trends['standard_error'], expected_se.values, rtol=1e-6)
+    assert (trends['standard_error'] > 0).all()
+    assert (trends['ci_lower'] <= trends['ci_upper']).all()
+
+
+def test_distance_cache_follows_reassigned_genetic_data(tmp_path):
+    """Reassigning genetic_data must not return the matrix of previously loaded sequences"""
+
+    fasta = tmp_path / 'isolates.fasta'
+    fasta.write_text(">iso1\nACGTACGT\n>iso2\nACGTACGA\n>iso3\nTCGTACGA\n")
+
+    analyzer = TransmissionNetworkAnalyzer()
+    assert analyzer.load_genetic_data(fasta)
+    loaded, error = analyzer.calculate_pairwise_distances()
+    assert error is None
+
+    # Reloading identical sequences reuses the cached matrix
+    assert analyzer.load_genetic_data(fasta)
+    assert analyzer.calculate_pairwise_distances()[0] is loaded
+
+    analyzer.genetic_data = {'a': 'AAAA', 'b': 'AATT'}
+    reassigned, error = analyzer.calculate_pairwise_distances()
+    assert error is None
+    assert list(reassigned.index) == ['a', 'b']
+    assert reassigned.loc['a', 'b'] == 2
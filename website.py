@@ -15,21 +15,36 @@ License: MIT
 import streamlit as st
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-import seaborn as sns
-from scipy import stats
 import warnings
-warnings.filterwarnings('ignore')
+import bisect
+from pathlib import Path
+from typing import NamedTuple, Tuple
+try:
+    import igraph as ig
+except ImportError:  # igraph is optional; the network page falls back to NetworkX
+    ig = None
+
+try:
+    from st_aggrid import AgGrid, GridUpdateMode
+except ImportError:  # streamlit-aggrid is optional; tables fall back to st.dataframe
+    AgGrid = None
+
+try:
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+except ImportError:  # pyarrow is optional; surveillance analysis falls back to sample data
+    ds = None
 
 # Import custom AMR analysis modules
 from Scripts.amr_surveillance_models import (
     AMRSurveillanceAnalyzer,
     StewardshipCalculator,
     TransmissionNetworkAnalyzer,
-    calculate_eucast_interpretation
+    calculate_eucast_interpretation,
+    combine_resistance_rate
 )
 
 # Set page configuration
@@ -40,6 +55,109 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Mode bar hidden on all charts; hover and zoom stay enabled (the plotly.js bundle
+# itself cannot be swapped under Streamlit)
+PLOTLY_CONFIG = {'displayModeBar': False}
+
+# Above this many points, scatter traces switch to WebGL (matches px render_mode='auto')
+WEBGL_MIN_POINTS = 1000
+
+# Surveillance records exported as Parquet (file or directory), with the same column
+# names as the sample data; the page only reads the slices a selection needs
+SURVEILLANCE_PARQUET = Path(__file__).parent / 'Data' / 'surveillance.parquet'
+
+# Global resistance patterns used as the prevalence reference in clinical decision support
+RESISTANCE_PATTERNS_CSV = Path(__file__).parent / 'Data' / 'amr_global_patterns.csv'
+
+# Stewardship intervention parameters, one row per intervention
+INTERVENTIONS_DF = pd.DataFrame.from_dict({
+    'Post-Prescription Antibiotic Review': {
+        'usage_reduction': 20,
+        'resistance_impact': -0.15,
+        'implementation_cost': 25000,
+        'annual_cost': 12000,
+        'infections_prevented': 80
+    },
+    'Computerized Decision Support System': {
+        'usage_reduction': 25,
+        'resistance_impact': -0.2,
+        'implementation_cost': 75000,
+        'annual_cost': 18000,
+        'infections_prevented': 120
+    },
+    'Prospective Audit and Feedback': {
+        'usage_reduction': 30,
+        'resistance_impact': -0.25,
+        'implementation_cost': 40000,
+        'annual_cost': 25000,
+        'infections_prevented': 150
+    },
+    'Formulary Restriction Programs': {
+        'usage_reduction': 35,
+        'resistance_impact': -0.3,
+        'implementation_cost': 15000,
+        'annual_cost': 8000,
+        'infections_prevented': 100
+    },
+    'Antibiotic Time-Out Protocol': {
+        'usage_reduction': 28,
+        'resistance_impact': -0.22,
+        'implementation_cost': 10000,
+        'annual_cost': 6000,
+        'infections_prevented': 95
+    }
+}, orient='index')
+
+class Question(NamedTuple):
+    """A multiple-choice quiz question with its correct option text resolved"""
+    question: str
+    options: Tuple[str, ...]
+    correct: int
+    explanation: str
+    correct_answer: str
+
+# Quiz questions are static; immutable records shared across reruns and sessions,
+# with the correct option text resolved once
+QUIZ_QUESTIONS = tuple(
+    Question(correct_answer=q["options"][q["correct"]], **q) for q in (
+        {
+            "question": "What is the primary mechanism of methicillin-resistant Staphylococcus aureus (MRSA)?",
+            "options": ("Efflux pumps", "Target site modification", "Enzymatic degradation", "Plasma membrane changes"),
+            "correct": 1,
+            "explanation": "MRSA develops resistance through altered penicillin-binding proteins (PBP2a) in the bacterial cell wall."
+        },
+        {
+            "question": "Which antibiotic class is considered 'last resort' for carbapenem-resistant infections?",
+            "options": ("Tetracyclines", "Colistin (polymyxin)", "Trimethoprim-sulfamethoxazole", "Nitrofurantoin"),
+            "correct": 1,
+            "explanation": "Colistin (polymyxin) is considered a last resort antibiotic due to its toxicity and limited alternatives."
+        },
+        {
+            "question": "What WHO strategy phase are we currently in for antimicrobial resistance?",
+            "options": ("Awareness", "Action", "Containment", "Prevention"),
+            "correct": 1,
+            "explanation": "The WHO Global Action Plan has three phases: Awareness (2015-2020), Action (2021-2025), and Containment (2026-2030)."
+        }
+    )
+)
+
+_QUIZ_HEADER = '<h2 class="section-header">❓ AMR Knowledge Assessment</h2>'
+
+# Final-score feedback as (upper bound %, st message function, text), sorted by bound;
+# a score lands in the first band whose bound exceeds it
+_SCORE_BANDS = (
+    (60, "warning", "📚 Additional study recommended. Focus on AMR mechanisms and stewardship."),
+    (80, "info", "👍 Good effort! Review key concepts for deeper understanding."),
+    (101, "success", "🎉 Excellent! You demonstrate strong AMR knowledge.")
+)
+_SCORE_BOUNDS = tuple(band[0] for band in _SCORE_BANDS)
+
+_TOTAL_QUESTIONS = len(QUIZ_QUESTIONS)
+
+# Widget keys and prompts per quiz question, formatted once
+_QUIZ_KEYS = tuple(f"q{i}" for i in range(_TOTAL_QUESTIONS))
+_QUIZ_PROMPTS = tuple(f"**Question {i+1}:** {q.question}" for i, q in enumerate(QUIZ_QUESTIONS))
+
 # Custom CSS for professional appearance
 st.markdown("""
 <style>
@@ -101,6 +219,45 @@ def main():
     else:  # Quiz Assessment
         display_quiz_assessment()
 
+@st.cache_resource
+def _priority_pathogens_fig():
+    """WHO priority pathogens chart (static data, built once)"""
+    pathogens = ['E. coli', 'S. aureus', 'K. pneumoniae', 'S. pneumoniae',
+                'A. baumannii', 'P. aeruginosa']
+    deaths = [95000, 80000, 68000, 49000, 43000, 38000]
+    amr_rates = [13.3, 32.1, 24.4, 21.4, 78.7, 18.4]
+
+    fig = make_subplots(specs=[[{"secondary_y": True}]])
+
+    fig.add_trace(
+        go.Bar(x=pathogens, y=deaths, name="Annual Deaths"),
+        secondary_y=False
+    )
+
+    fig.add_trace(
+        go.Scatter(x=pathogens, y=amr_rates, name="AMR Rate (%)",
+                  mode='lines+markers', line=dict(color='red')),
+        secondary_y=True
+    )
+
+    fig.update_layout(title="WHO Priority Pathogens: Deaths vs AMR Rates",
+                     xaxis_tickangle=-45)
+    fig.update_yaxes(title_text="Annual Deaths", secondary_y=False)
+    fig.update_yaxes(title_text="AMR Rate (%)", secondary_y=True)
+
+    return fig
+
+@st.cache_resource
+def _regional_burden_fig():
+    """Regional AMR burden pie chart (static data, built once)"""
+    regions = ['Africa', 'SE Asia', 'Eastern Med', 'Europe', 'Americas', 'Western Pacific']
+    burden = [25, 23, 18, 15, 12, 8]  # Percentage of global AMR burden
+
+    fig = go.Figure(data=[go.Pie(labels=regions, values=burden, pull=[0.1, 0, 0, 0, 0, 0])])
+    fig.update_layout(title="Regional Distribution of AMR Burden")
+
+    return fig
+
 def display_dashboard():
     """Main dashboard with AMR overview and key metrics"""
 
@@ -125,41 +282,10 @@ def display_dashboard():
     col1, col2 = st.columns(2)
 
     with col1:
-        # WHO priority pathogens chart
-        pathogens = ['E. coli', 'S. aureus', 'K. pneumoniae', 'S. pneumoniae',
-                    'A. baumannii', 'P. aeruginosa']
-        deaths = [95000, 80000, 68000, 49000, 43000, 38000]
-        amr_rates = [13.3, 32.1, 24.4, 21.4, 78.7, 18.4]
-
-        fig = make_subplots(specs=[[{"secondary_y": True}]])
-
-        fig.add_trace(
-            go.Bar(x=pathogens, y=deaths, name="Annual Deaths"),
-            secondary_y=False
-        )
-
-        fig.add_trace(
-            go.Scatter(x=pathogens, y=amr_rates, name="AMR Rate (%)",
-                      mode='lines+markers', line=dict(color='red')),
-            secondary_y=True
-        )
-
-        fig.update_layout(title="WHO Priority Pathogens: Deaths vs AMR Rates",
-                         xaxis_tickangle=-45)
-        fig.update_yaxes(title_text="Annual Deaths", secondary_y=False)
-        fig.update_yaxes(title_text="AMR Rate (%)", secondary_y=True)
-
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(_priority_pathogens_fig(), use_container_width=True, config=PLOTLY_CONFIG)
 
     with col2:
-        # Regional AMR burden
-        regions = ['Africa', 'SE Asia', 'Eastern Med', 'Europe', 'Americas', 'Western Pacific']
-        burden = [25, 23, 18, 15, 12, 8]  # Percentage of global AMR burden
-
-        fig = go.Figure(data=[go.Pie(labels=regions, values=burden, pull=[0.1, 0, 0, 0, 0, 0])])
-        fig.update_layout(title="Regional Distribution of AMR Burden")
-
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(_regional_burden_fig(), use_container_width=True, config=PLOTLY_CONFIG)
 
     # Key resistance mechanisms
     st.markdown('<h3 class="section-header">🔬 Key Resistance Mechanisms</h3>', unsafe_allow_html=True)
@@ -181,6 +307,17 @@ def display_dashboard():
     # Interactive map will be added in surveillance section
     st.info("🔍 Click on 'Surveillance Analysis' to explore resistance patterns by region and pathogen.")
 
+def _render_table(df, key):
+    """Show a table with AgGrid when available, otherwise st.dataframe"""
+    if AgGrid is None:
+        st.dataframe(df, use_container_width=True)
+        return
+
+    # AgGrid has no index column; a named index becomes a regular column
+    if df.index.name is not None:
+        df = df.reset_index()
+    AgGrid(df, update_mode=GridUpdateMode.NO_UPDATE, key=key, enable_enterprise_modules=False)
+
 def display_surveillance_analysis():
     """Interactive AMR surveillance analysis tools"""
 
@@ -189,8 +326,8 @@ def display_surveillance_analysis():
     # Sample data generation for demonstration
     @st.cache_data
     def generate_sample_data():
-        """Generate realistic AMR surveillance data for demonstration"""
-        np.random.seed(42)
+        """Generate AMR surveillance data for demonstration with its filter options"""
+        rng = np.random.default_rng(42)
 
         # Pathogens and antibiotics
         pathogens = ['E. coli', 'K. pneumoniae', 'S. aureus', 'P. aeruginosa',
@@ -198,41 +335,116 @@ def display_surveillance_analysis():
         antibiotics = ['Ciprofloxacin', 'Ceftriaxone', 'Meropenem', 'Vancomycin',
                       'Amoxicillin', 'Gentamicin', 'Colistin']
 
-        # Regions
+        # Regions and their resistance offsets (regions without one get 0)
         regions = ['North America', 'South America', 'Europe', 'Africa',
                   'Asia', 'Middle East', 'Australia']
+        region_modifiers = {'Africa': 15, 'Asia': 12, 'Europe': -5,
+                            'North America': 0, 'South America': 8}
+        years = [2020, 2021, 2022, 2023]
+
+        # Every pathogen x antibiotic x region x year combination as one row
+        grid = pd.MultiIndex.from_product(
+            [pathogens, antibiotics, regions, years],
+            names=['pathogen', 'antimicrobial', 'country_name', 'reporting_year']
+        ).to_frame(index=False)
+        n_rows = len(grid)
+
+        # Generate realistic resistance rates for all rows at once
+        base_rate = rng.uniform(5, 30, n_rows).astype(np.float32)
+        region_modifier = grid['country_name'].map(region_modifiers).fillna(0).to_numpy(np.float32)
+        year_modifier = ((grid['reporting_year'].to_numpy() - 2020) * 2).astype(np.float32)  # slight upward trend
+        noise = rng.normal(0, 5, n_rows).astype(np.float32)
+        resistance_rate = combine_resistance_rate(base_rate, region_modifier, year_modifier, noise)
+
+        grid['resistance_percentage'] = resistance_rate.round(1)
+        grid['total_isolates'] = rng.integers(50, 500, n_rows)
+        grid['confidence_interval_lower'] = np.maximum(0, resistance_rate - rng.uniform(3, 8, n_rows))
+        grid['confidence_interval_upper'] = np.minimum(100, resistance_rate + rng.uniform(3, 8, n_rows))
+
+        # Low-cardinality labels as categories, small numeric ranges downcast
+        grid = grid.astype({
+            'pathogen': 'category',
+            'antimicrobial': 'category',
+            'country_name': 'category',
+            'reporting_year': 'int16',
+            'resistance_percentage': 'float32',
+            'total_isolates': 'int16',
+            'confidence_interval_lower': 'float32',
+            'confidence_interval_upper': 'float32'
+        })
+
+        # Selectbox options are computed once alongside the cached data
+        return grid, tuple(pathogens), tuple(antibiotics), tuple(sorted(years))
+
+    @st.cache_data
+    def surveillance_filter_view():
+        """Narrow projection with only the columns the page filters and displays"""
+        df = generate_sample_data()[0]
+        view = df[['pathogen', 'antimicrobial', 'country_name', 'reporting_year',
+                   'resistance_percentage', 'total_isolates']]
+        # Indexed by the selectbox keys so filters are index lookups, not full scans
+        return view.set_index(['pathogen', 'antimicrobial', 'reporting_year']).sort_index()
+
+    @st.cache_resource
+    def load_surveillance(path):
+        """Open the Parquet surveillance dataset; rows are read per query"""
+        return ds.dataset(path, format='parquet')
+
+    @st.cache_data
+    def surveillance_options(path):
+        """Selectbox options from the key columns of the Parquet dataset"""
+        table = load_surveillance(path).to_table(columns=['pathogen', 'antimicrobial', 'reporting_year'])
+        return tuple(
+            tuple(sorted(pc.unique(table[column]).to_pylist()))
+            for column in ['pathogen', 'antimicrobial', 'reporting_year']
+        )
 
-        # Generate synthetic data
-        data = []
-        for pathogen in pathogens:
-            for antibiotic in antibiotics:
-                for region in regions:
-                    for year in [2020, 2021, 2022, 2023]:
-                        # Generate realistic resistance rates
-                        base_rate = np.random.uniform(5, 30)
-                        region_modifier = {'Africa': 15, 'Asia': 12, 'Europe': -5,
-                                         'North America': 0, 'South America': 8}[region.split()[0]]
-                        year_modifier = (year - 2020) * 2  # slight upward trend
-
-                        resistance_rate = min(95, max(2, base_rate + region_modifier + year_modifier +
-                                                     np.random.normal(0, 5)))
-
-                        data.append({
-                            'pathogen': pathogen,
-                            'antimicrobial': antibiotic,
-                            'country_name': region,
-                            'reporting_year': year,
-                            'resistance_percentage': round(resistance_rate, 1),
-                            'total_isolates': np.random.randint(50, 500),
-                            'confidence_interval_lower': max(0, resistance_rate - np.random.uniform(3, 8)),
-                            'confidence_interval_upper': min(100, resistance_rate + np.random.uniform(3, 8))
-                        })
-
-        return pd.DataFrame(data)
+    def select_rows(pathogen, antibiotic, years):
+        """Rows for one pathogen/antibiotic pair in the given years"""
+        if parquet_path is not None:
+            # Column pruning and predicate pushdown: only the matching slice is read
+            return load_surveillance(parquet_path).to_table(
+                columns=['reporting_year', 'country_name', 'resistance_percentage', 'total_isolates'],
+                filter=(pc.field('pathogen') == pathogen) &
+                       (pc.field('antimicrobial') == antibiotic) &
+                       pc.field('reporting_year').isin(list(years))
+            ).to_pandas()
+
+        try:
+            return df.loc[pd.IndexSlice[pathogen, antibiotic, list(years)], :]
+        except KeyError:
+            return df.iloc[:0]
+
+    @st.cache_data
+    def build_risk_table(data_source, pathogen, antibiotic, year):
+        """Risk level per region for one selection; cached on the selection keys
+        and data source rather than by hashing the filtered rows"""
+        filtered_data = select_rows(pathogen, antibiotic, [year])
+
+        # Low < 15% <= Medium < 25% <= High
+        risk_level = pd.cut(
+            filtered_data['resistance_percentage'],
+            bins=[-np.inf, 15, 25, np.inf],
+            labels=['🔵 Low Risk', '🟡 Medium Risk', '🔴 High Risk'],
+            right=False
+        )
+
+        risk_df = pd.DataFrame({
+            'Region': filtered_data['country_name'].values,
+            'Resistance Rate': filtered_data['resistance_percentage'].map('{:.1f}%'.format).values,
+            'Risk Level': risk_level.values,
+            'Sample Size': filtered_data['total_isolates'].values
+        })
+        return risk_df
 
     # Load or generate data
+    parquet_path = str(SURVEILLANCE_PARQUET) if ds is not None and SURVEILLANCE_PARQUET.exists() else None
     try:
-        df = generate_sample_data()
+        if parquet_path is not None:
+            pathogen_options, antibiotic_options, year_options = surveillance_options(parquet_path)
+        else:
+            _, pathogen_options, antibiotic_options, year_options = generate_sample_data()
+            df = surveillance_filter_view()
     except:
         st.error("Unable to load surveillance data. Please check data sources.")
         return
@@ -245,30 +457,26 @@ def display_surveillance_analysis():
     with col1:
         selected_pathogen = st.selectbox(
             "Select Pathogen:",
-            options=df['pathogen'].unique(),
+            options=pathogen_options,
             index=0
         )
 
     with col2:
         selected_antibiotic = st.selectbox(
             "Select Antibiotic:",
-            options=df['antimicrobial'].unique(),
+            options=antibiotic_options,
             index=0
         )
 
     with col3:
         selected_year = st.selectbox(
             "Select Year:",
-            options=sorted(df['reporting_year'].unique()),
-            index=-1
+            options=year_options,
+            index=len(year_options) - 1
         )
 
     # Filter data based on selections
-    filtered_data = df[
-        (df['pathogen'] == selected_pathogen) &
-        (df['antimicrobial'] == selected_antibiotic) &
-        (df['reporting_year'] == selected_year)
-    ]
+    filtered_data = select_rows(selected_pathogen, selected_antibiotic, [selected_year])
 
     # Display results
     if not filtered_data.empty:
@@ -299,30 +507,15 @@ def display_surveillance_analysis():
             color_continuous_scale='Reds'
         )
         fig.update_layout(xaxis_tickangle=-45)
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
 
         # Risk categorization
         st.markdown("### 🚨 Risk Assessment")
 
-        categories = []
-        for idx, row in filtered_data.iterrows():
-            rate = row['resistance_percentage']
-            if rate < 15:
-                risk = "🔵 Low Risk"
-            elif rate < 25:
-                risk = "🟡 Medium Risk"
-            else:
-                risk = "🔴 High Risk"
-
-            categories.append({
-                'Region': row['country_name'],
-                'Resistance Rate': f"{rate:.1f}%",
-                'Risk Level': risk,
-                'Sample Size': row['total_isolates']
-            })
-
-        risk_df = pd.DataFrame(categories)
-        st.dataframe(risk_df, use_container_width=True)
+        _render_table(
+            build_risk_table(parquet_path, selected_pathogen, selected_antibiotic, selected_year),
+            key='risk-grid'
+        )
 
     else:
         st.warning("No data available for selected combination. Try different parameters.")
@@ -334,39 +527,38 @@ def display_surveillance_analysis():
     # Year comparison
     trend_years = st.multiselect(
         "Select years to compare:",
-        options=sorted(df['reporting_year'].unique()),
-        default=sorted(df['reporting_year'].unique())[-3:]  # Last 3 years
+        options=year_options,
+        default=year_options[-3:]  # Last 3 years
     )
 
     if trend_years and selected_pathogen and selected_antibiotic:
-        trend_data = df[
-            (df['pathogen'] == selected_pathogen) &
-            (df['antimicrobial'] == selected_antibiotic) &
-            (df['reporting_year'].isin(trend_years))
-        ]
+        trend_data = select_rows(selected_pathogen, selected_antibiotic, trend_years)
 
         if not trend_data.empty:
-            # Group by year and region
-            year_region_avg = trend_data.groupby(['reporting_year', 'country_name'])['resistance_percentage'].mean().reset_index()
+            # One column per region, one row per year
+            wide = trend_data.pivot_table(
+                index='reporting_year',
+                columns='country_name',
+                values='resistance_percentage',
+                aggfunc='mean',
+                observed=True
+            )
 
             fig = px.line(
-                year_region_avg,
-                x='reporting_year',
-                y='resistance_percentage',
-                color='country_name',
+                wide,
                 title=f'{selected_pathogen} Resistance Trends to {selected_antibiotic}',
+                labels={'value': 'resistance_percentage'},
                 markers=True
             )
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
 
-            # Trend analysis
+            # Trend analysis (first to last observed year per region)
             st.markdown("#### Trend Analysis")
-            for region in year_region_avg['country_name'].unique():
-                region_data = year_region_avg[year_region_avg['country_name'] == region]
-                if len(region_data) > 1:
-                    change = region_data['resistance_percentage'].iloc[-1] - region_data['resistance_percentage'].iloc[0]
-                    trend = "↑ Increasing" if change > 2 else "↓ Decreasing" if change < -2 else "→ Stable"
-                    st.write(f"**{region}**: {change:+.1f}% change ({trend})")
+            observed_years = wide.count()
+            change = (wide.ffill().iloc[-1] - wide.bfill().iloc[0])[observed_years > 1]
+            trend = np.select([change > 2, change < -2], ["↑ Increasing", "↓ Decreasing"], default="→ Stable")
+            for region, region_change, region_trend in zip(change.index, change, trend):
+                st.write(f"**{region}**: {region_change:+.1f}% change ({region_trend})")
 
 def display_stewardship_calculator():
     """Interactive antibiotic stewardship impact calculator"""
@@ -378,58 +570,19 @@ def display_stewardship_calculator():
     on resistance rates, antibiotic usage patterns, and clinical outcomes.
     """)
 
-    # Intervention selection
-    interventions = {
-        'Post-Prescription Antibiotic Review': {
-            'usage_reduction': 20,
-            'resistance_impact': -0.15,
-            'implementation_cost': 25000,
-            'annual_cost': 12000,
-            'infections_prevented': 80
-        },
-        'Computerized Decision Support System': {
-            'usage_reduction': 25,
-            'resistance_impact': -0.2,
-            'implementation_cost': 75000,
-            'annual_cost': 18000,
-            'infections_prevented': 120
-        },
-        'Prospective Audit and Feedback': {
-            'usage_reduction': 30,
-            'resistance_impact': -0.25,
-            'implementation_cost': 40000,
-            'annual_cost': 25000,
-            'infections_prevented': 150
-        },
-        'Formulary Restriction Programs': {
-            'usage_reduction': 35,
-            'resistance_impact': -0.3,
-            'implementation_cost': 15000,
-            'annual_cost': 8000,
-            'infections_prevented': 100
-        },
-        'Antibiotic Time-Out Protocol': {
-            'usage_reduction': 28,
-            'resistance_impact': -0.22,
-            'implementation_cost': 10000,
-            'annual_cost': 6000,
-            'infections_prevented': 95
-        }
-    }
-
     col1, col2 = st.columns(2)
 
     with col1:
         st.markdown("### 🔧 Intervention Parameters")
         selected_intervention = st.selectbox(
             "Select Stewardship Intervention:",
-            options=list(interventions.keys())
+            options=INTERVENTIONS_DF.index
         )
 
         # Customize parameters if needed
         customize = st.checkbox("Customize parameters")
         if customize:
-            params = interventions[selected_intervention].copy()
+            params = INTERVENTIONS_DF.loc[selected_intervention].copy()
             st.markdown("#### Baseline Parameters:")
             for key, value in params.items():
                 if key in ['usage_reduction', 'resistance_impact']:
@@ -440,15 +593,15 @@ def display_stewardship_calculator():
                 elif 'cost' in key:
                     params[key] = st.number_input(
                         f"{key.replace('_', ' ').title()}: $",
-                        min_value=0, value=value, step=1000
+                        min_value=0, value=int(value), step=1000
                     )
                 else:  # infections_prevented
                     params[key] = st.number_input(
                         f"{key.replace('_', ' ').title()}:",
-                        min_value=0, value=value, step=10
+                        min_value=0, value=int(value), step=10
                     )
         else:
-            params = interventions[selected_intervention]
+            params = INTERVENTIONS_DF.loc[selected_intervention]
 
         # Hospital size input
         hospital_size = st.slider("Hospital Size (beds):", 100, 2000, 500)
@@ -459,9 +612,11 @@ def display_stewardship_calculator():
         # Results display
         st.markdown("### 📊 Impact Projections")
 
+        # Register the selected intervention with the parameters set on this page
         calculator = StewardshipCalculator()
+        calculator.define_intervention(selected_intervention, params.to_dict())
         cost_benefits, error = calculator.calculate_cost_benefit(
-            "custom" if customize else selected_intervention,
+            selected_intervention,
             hospital_size=hospital_size,
             daily_bed_cost=daily_bed_cost,
             avg_length_stay=avg_length_stay
@@ -489,42 +644,31 @@ def display_stewardship_calculator():
             st.markdown("#### 📈 5-Year Impact Projection")
 
             simulation_years = 5
-            resistance_trend = []
-            usage_trend = []
-
             baseline_resistance = 25.0  # 25% baseline resistance
             baseline_usage = 100.0     # 100 DDD/1000 patient-days
 
-            for year in range(simulation_years + 1):
-                if year == 0:
-                    res_rate = baseline_resistance
-                    usage_rate = baseline_usage
-                else:
-                    # Apply intervention effects (gradual implementation)
-                    reduction_factor = 1 - (params['usage_reduction']/100) * min(1, year/2)
-                    usage_rate = baseline_usage * reduction_factor
-
-                    # Resistance reduction (delayed by 1 year)
-                    if year >= 2:
-                        res_reduction = abs(params['resistance_impact']) * (year-1) / simulation_years
-                        res_rate = baseline_resistance * (1 - res_reduction)
-                    else:
-                        res_rate = baseline_resistance
-
-                resistance_trend.append(res_rate)
-                usage_trend.append(usage_rate)
+            years = np.arange(simulation_years + 1)
+
+            # Apply intervention effects (gradual implementation)
+            reduction_factor = 1 - (params['usage_reduction']/100) * np.minimum(1, years/2)
+            reduction_factor[0] = 1
+            usage_trend = baseline_usage * reduction_factor
+
+            # Resistance reduction (delayed by 1 year)
+            res_reduction = np.where(years >= 2, abs(params['resistance_impact']) * (years-1) / simulation_years, 0.0)
+            resistance_trend = baseline_resistance * (1 - res_reduction)
 
             # Plot trends
             fig = make_subplots(specs=[[{"secondary_y": True}]])
 
             fig.add_trace(
-                go.Scatter(x=list(range(simulation_years+1)), y=resistance_trend,
+                go.Scatter(x=years, y=resistance_trend,
                           name="Resistance Rate (%)", line=dict(color='red')),
                 secondary_y=False
             )
 
             fig.add_trace(
-                go.Scatter(x=list(range(simulation_years+1)), y=usage_trend,
+                go.Scatter(x=years, y=usage_trend,
                           name="Antibiotic Usage", line=dict(color='blue')),
                 secondary_y=True
             )
@@ -534,7 +678,7 @@ def display_stewardship_calculator():
             fig.update_yaxes(title_text="Resistance Rate (%)", secondary_y=False)
             fig.update_yaxes(title_text="Usage (DDD/1000 patient-days)", secondary_y=True)
 
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
 
     # Comparison section
     st.markdown("---")
@@ -543,26 +687,26 @@ def display_stewardship_calculator():
     compare = st.checkbox("Compare selected intervention with others")
 
     if compare:
-        comparison_data = {}
-        interventions_to_compare = list(interventions.keys())
-        interventions_to_compare.append(selected_intervention if customize else None)
-        interventions_to_compare = list(set([i for i in interventions_to_compare if i]))
-
-        for intervention in interventions_to_compare:
-            results, _ = calculator.simulate_stewardship_impact(intervention, 3)
-            if results:
-                cost_benefits, _ = calculator.calculate_cost_benefit(intervention)
-                if cost_benefits:
-                    comparison_data[intervention] = {
-                        'resistance_reduction': baseline_resistance - results['resistance_trend'].iloc[-1]['resistance_rate'],
-                        'usage_reduction_3yr': baseline_usage - results['usage_trend'].iloc[-1]['usage_rate'],
-                        'annual_cost_savings': cost_benefits['annual_cost_savings'],
-                        'payback_years': cost_benefits['payback_period_years']
-                    }
-
-        if comparison_data:
-            comparison_df = pd.DataFrame(comparison_data).T.round(2)
-            st.dataframe(comparison_df, use_container_width=True)
+        # The selected row carries any customized parameters, and costs use the
+        # page inputs, so the table agrees with the projections above
+        interventions = INTERVENTIONS_DF.astype(float)
+        interventions.loc[selected_intervention] = params
+        batch_results, _ = calculator.batch_cost_benefit(
+            interventions,
+            hospital_size=hospital_size,
+            daily_bed_cost=daily_bed_cost,
+            avg_length_stay=avg_length_stay,
+            simulation_years=3
+        )
+
+        if batch_results is not None:
+            comparison_df = pd.DataFrame({
+                'resistance_reduction': batch_results['resistance_reduction_final'],
+                'usage_reduction_3yr': batch_results['usage_reduction_final'],
+                'annual_cost_savings': batch_results['annual_cost_savings'],
+                'payback_years': batch_results['payback_period_years']
+            }).round(2).rename_axis('Intervention')
+            _render_table(comparison_df, key='comparison-grid')
 
             # Best recommendations
             best_cost_savings = comparison_df['annual_cost_savings'].idxmax()
@@ -605,41 +749,99 @@ def display_transmission_modeling():
 
         # Generate sample transmission data
         @st.cache_data
-        def generate_sample_network():
+        def generate_sample_network(seed=42, n_isolates=50):
             """Generate sample transmission network data"""
-            np.random.seed(42)
+            rng = np.random.default_rng(seed)
 
             # Create sample isolates and connections
-            n_isolates = 50
-            isolates = [f"Isolate_{i+1:02d}" for i in range(n_isolates)]
-
-            # Create random transmission edges
-            edges = []
-            for i in range(n_isolates):
-                # Each isolate connects to 1-3 others on average
-                n_connections = np.random.poisson(2) + 1
-                connections = np.random.choice(
-                    isolates, size=min(n_connections, n_isolates-1),
-                    replace=False
-                )
-
-                for other_isolate in connections:
-                    if other_isolate != isolates[i]:
-                        # Genetic distance based on sequence similarity
-                        genetic_dist = np.random.uniform(2, 15)
-                        transmission_prob = max(0.1, 1 - genetic_dist/20)
-
-                        edges.append({
-                            'source': isolates[i],
-                            'target': other_isolate,
-                            'genetic_distance': genetic_dist,
-                            'transmission_probability': transmission_prob,
-                            'pathogen': np.random.choice(['S. aureus', 'E. coli', 'K. pneumoniae'])
-                        })
-
-            return pd.DataFrame(edges)
-
-        network_data = generate_sample_network()
+            isolates = np.char.add('Isolate_', np.char.zfill((np.arange(n_isolates) + 1).astype(str), 2))
+
+            # Each isolate connects to 1-3 others on average
+            degrees = rng.poisson(2, n_isolates) + 1
+            source = np.repeat(np.arange(n_isolates), degrees)
+            target = rng.integers(0, n_isolates, degrees.sum())
+            mask = source != target
+            source, target = source[mask], target[mask]
+            n_edges = len(source)
+
+            # Genetic distance based on sequence similarity
+            genetic_dist = rng.uniform(2, 15, n_edges)
+
+            return pd.DataFrame({
+                'source': isolates[source],
+                'target': isolates[target],
+                'genetic_distance': genetic_dist,
+                'transmission_probability': np.maximum(0.1, 1 - genetic_dist/20),
+                'pathogen': rng.choice(['S. aureus', 'E. coli', 'K. pneumoniae'], n_edges)
+            })
+
+        @st.cache_resource
+        def build_network_artifacts(seed=42, n_isolates=50):
+            """Build the sample network graph, layout and centralities once"""
+            network_data = generate_sample_network(seed, n_isolates)
+            edge_pairs = network_data[['source', 'target']].itertuples(index=False)
+
+            if ig is not None:
+                # Build the graph in one shot and use igraph's C routines
+                g = ig.Graph.TupleList(edge_pairs, directed=False)
+                g.simplify()
+                node_names = g.vs['name']
+                edge_index = np.array(g.get_edgelist()).reshape(-1, 2)
+                degree = np.array(g.degree())
+                betweenness = np.array(g.betweenness())
+                layout = g.layout_fruchterman_reingold(seed=np.random.default_rng(seed).random((g.vcount(), 2)).tolist())
+                node_xy = np.array(layout.coords)
+                cluster_sizes = g.connected_components().sizes()
+            else:
+                import networkx as nx
+
+                G = nx.Graph(list(edge_pairs))
+                node_names = list(G.nodes())
+                node_ids = {name: i for i, name in enumerate(node_names)}
+                edge_index = np.array([(node_ids[u], node_ids[v]) for u, v in G.edges()]).reshape(-1, 2)
+                degree = np.array([d for _, d in G.degree()])
+                betweenness = np.array(list(nx.betweenness_centrality(G, normalized=False).values()))
+                pos = nx.spring_layout(G, seed=seed)
+                node_xy = np.array([pos[n] for n in node_names])
+                cluster_sizes = [len(c) for c in nx.connected_components(G)]
+
+            # Normalize centralities the way NetworkX reports them
+            n_nodes = len(node_names)
+            degree_centrality = degree / max(n_nodes - 1, 1)
+            if n_nodes > 2:
+                betweenness = betweenness * 2 / ((n_nodes - 1) * (n_nodes - 2))
+
+            return (network_data, node_names, node_xy, edge_index, degree,
+                    degree_centrality, betweenness, cluster_sizes)
+
+        @st.cache_data
+        def compute_network_plot_data(seed, n_isolates):
+            """Plotly-ready edge and node arrays for the cached network"""
+            (_, node_names, node_xy, edge_index, degree,
+             _, betweenness, _) = build_network_artifacts(seed, n_isolates)
+
+            # Edge coordinates for the line trace (NaN breaks the line between edges)
+            n_edges = len(edge_index)
+            edge_x = np.full(3 * n_edges, np.nan)
+            edge_y = np.full(3 * n_edges, np.nan)
+            edge_x[0::3], edge_y[0::3] = node_xy[edge_index[:, 0]].T
+            edge_x[1::3], edge_y[1::3] = node_xy[edge_index[:, 1]].T
+
+            return {
+                'edge_x': edge_x,
+                'edge_y': edge_y,
+                'node_x': node_xy[:, 0],
+                'node_y': node_xy[:, 1],
+                'node_text': [f"Isolate: {node}<br>Degree: {d}<br>Centrality: {c:.3f}"
+                              for node, d, c in zip(node_names, degree, betweenness)],
+                'node_size': 10 + degree * 5,
+                'node_color': betweenness
+            }
+
+        seed, n_isolates = 42, 50
+        (network_data, node_names, _, edge_index, _,
+         degree_centrality, _, cluster_sizes) = build_network_artifacts(seed, n_isolates)
+        plot_data = compute_network_plot_data(seed, n_isolates)
 
         st.markdown("### 📊 Network Analysis Results")
 
@@ -654,86 +856,36 @@ def display_transmission_modeling():
             st.metric("Transmission Links", len(network_data))
 
         # Interactive network visualization
-        import networkx as nx
-
-        # Create NetworkX graph
-        G = nx.Graph()
-        for _, row in network_data.iterrows():
-            G.add_edge(row['source'], row['target'],
-                      genetic_distance=row['genetic_distance'],
-                      transmission_probability=row['transmission_probability'],
-                      pathogen=row['pathogen'])
-
-        # Calculate centrality measures
-        degree_centrality = nx.degree_centrality(G)
-        betweenness_centrality = nx.betweenness_centrality(G)
-
-        # Visualization
-        pos = nx.spring_layout(G, seed=42)
-
-        # Create edge trace
-        edge_x = []
-        edge_y = []
-        for edge in G.edges():
-            x0, y0 = pos[edge[0]]
-            x1, y1 = pos[edge[1]]
-            edge_x.append(x0)
-            edge_x.append(x1)
-            edge_x.append(None)
-            edge_y.append(y0)
-            edge_y.append(y1)
-            edge_y.append(None)
-
-        edge_trace = go.Scatter(
-            x=edge_x, y=edge_y,
+        scatter = go.Scattergl if len(plot_data['edge_x']) > WEBGL_MIN_POINTS else go.Scatter
+        edge_trace = scatter(
+            x=plot_data['edge_x'], y=plot_data['edge_y'],
             line=dict(width=0.5, color='#888'),
             hoverinfo='none',
             mode='lines')
 
         # Create node trace
-        node_x = []
-        node_y = []
-        node_text = []
-        node_color = []
-        node_size = []
-
-        for node in G.nodes():
-            x, y = pos[node]
-            node_x.append(x)
-            node_y.append(y)
-
-            # Node properties
-            degree = G.degree(node)
-            betweenness = betweenness_centrality[node]
-
-            node_text.append(f"Isolate: {node}<br>Degree: {degree}<br>Centrality: {betweenness:.3f}")
-            node_size.append(10 + degree * 5)
-            node_color.append(betweenness)
-
-        node_trace = go.Scatter(
-            x=node_x, y=node_y,
+        node_trace = scatter(
+            x=plot_data['node_x'], y=plot_data['node_y'],
             mode='markers',
             hoverinfo='text',
-            text=node_text,
+            text=plot_data['node_text'],
             marker=dict(
                 showscale=True,
                 colorscale='YlOrRd',
                 reversescale=True,
-                color=node_color,
-                size=node_size,
+                color=plot_data['node_color'],
+                size=plot_data['node_size'],
                 colorbar=dict(
                     thickness=15,
-                    title='Betweenness<br>Centrality',
-                    xanchor='left',
-                    titleside='right'
+                    title=dict(text='Betweenness<br>Centrality', side='right'),
+                    xanchor='left'
                 ),
                 line_width=2))
 
         # Create the figure
         fig = go.Figure(data=[edge_trace, node_trace],
                        layout=go.Layout(
-                           title='AMR Transmission Network',
-                           titlefont_size=16,
+                           title=dict(text='AMR Transmission Network', font=dict(size=16)),
                            showlegend=False,
                            hovermode='closest',
                            margin=dict(b=20,l=5,r=5,t=40),
@@ -741,27 +893,101 @@ def display_transmission_modeling():
                            yaxis=dict(showgrid=False, zeroline=False, showticklabels=False))
                        )
 
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
 
         # Key isolates analysis
         st.markdown("### 🎯 Key Isolates Analysis")
 
         # Most central isolates
-        central_isolates = sorted(degree_centrality.items(), key=lambda x: x[1], reverse=True)[:5]
+        central_isolates = sorted(zip(node_names, degree_centrality), key=lambda x: x[1], reverse=True)[:5]
 
         st.markdown("**Top 5 Most Connected Isolates:**")
         for isolate, centrality in central_isolates:
             st.markdown(f"- **{isolate}**: {centrality:.3f} (Degree centrality)")
 
         # Cluster analysis
-        if len(G.edges()) > 0:
-            clusters = list(nx.connected_components(G))
-            n_clusters = len(clusters)
+        if len(edge_index) > 0:
+            n_clusters = len(cluster_sizes)
 
             st.markdown(f"\n**Network Structure:** {n_clusters} transmission clusters identified")
-            cluster_sizes = [len(cluster) for cluster in clusters]
             st.markdown(f"Cluster sizes: {sorted(cluster_sizes, reverse=True)}")
 
+_CDS_MARKDOWN = """
+### 💊 Clinical Decision Support for AMR
+
+#### Decision Framework:
+1. **Patient History**: Recent antibiotic exposure? Hospitalized recently?
+2. **Local Prevalence**: What resistance patterns exist locally?
+3. **Antibiotic Selection**: Narrowest spectrum for shortest duration
+4. **Monitoring**: Clinical response and microbiology follow-up
+"""
+
+# Risk label by score 0-4: 0 low, 1 medium, 2+ high
+_RISK_LABELS = (
+    "🟢 Low Risk - Empirical therapy may be appropriate",
+    "🟡 Medium Risk - Microbiological testing recommended",
+    "🔴 High Risk - Consider broad-spectrum with microbiological confirmation",
+    "🔴 High Risk - Consider broad-spectrum with microbiological confirmation",
+    "🔴 High Risk - Consider broad-spectrum with microbiological confirmation"
+)
+
+# Usual causative organisms per infection type, for the prevalence lookup
+_INFECTION_ORGANISMS = {
+    "UTI": ["Enterobacteriaceae", "Klebsiella pneumoniae", "Enterococcus spp."],
+    "Pneumonia": ["Streptococcus pneumoniae", "Staphylococcus aureus",
+                  "Klebsiella pneumoniae", "Pseudomonas aeruginosa"],
+    "Skin/Soft Tissue": ["Staphylococcus aureus"],
+    "Intra-abdominal": ["Enterobacteriaceae", "Klebsiella pneumoniae",
+                        "Pseudomonas aeruginosa", "Enterococcus spp."]
+}
+
+@st.cache_resource
+def _load_resistance_table() -> pd.Series:
+    """Global reference resistance rate (%) by organism and antibiotic, isolate-weighted over
+    all regions and years (not local prevalence); shared read-only across sessions"""
+    patterns = pd.read_csv(RESISTANCE_PATTERNS_CSV,
+                           usecols=['organism', 'antibiotic', 'resistance_rate', 'total_isolates'])
+
+    # Weight each region/year rate by its isolate count
+    sums = patterns.assign(
+        _rn=patterns['resistance_rate'] * patterns['total_isolates']
+    ).groupby(['organism', 'antibiotic'])[['_rn', 'total_isolates']].sum()
+    return (sums['_rn'] / sums['total_isolates']).rename('resistance_rate').round(1)
+
+@st.cache_data
+def compute_risk(elderly, hospitalization, antibiotic_history):
+    """AMR risk score and label from patient risk factors"""
+    risk_score = int(elderly) + 2 * int(hospitalization) + int(antibiotic_history)
+    risk_level = _RISK_LABELS[min(risk_score, 4)]
+
+    return risk_score, risk_level
+
+@st.fragment
+def display_clinical_decision_support():
+    """Patient assessment tool for the clinical decision making module"""
+
+    st.markdown("#### 📋 Patient Assessment Tool")
+
+    age = st.slider("Patient Age:", 0, 100, 50)
+    hospitalization = st.checkbox("Recent Hospitalization (<30 days)")
+    antibiotic_history = st.checkbox("Antibiotic use in last 3 months")
+    infection_type = st.selectbox("Infection Type:", ["UTI", "Pneumonia", "Skin/Soft Tissue", "Intra-abdominal"])
+
+    # Risk calculation; only the over-65 threshold of age enters the score
+    risk_score, risk_level = compute_risk(age > 65, hospitalization, antibiotic_history)
+
+    st.metric("AMR Risk Assessment", risk_level)
+    st.caption(f"Risk Score: {risk_score}/4 based on patient factors")
+
+    # Global reference rates for the usual organisms of the selected infection;
+    # a stand-in until local antibiogram data is available
+    prevalence = _load_resistance_table()
+    organisms = prevalence.index.unique(level='organism').intersection(_INFECTION_ORGANISMS[infection_type])
+    st.markdown(f"**Global Reference Resistance Rates (%) - {infection_type}**")
+    st.dataframe(prevalence.loc[organisms].rename('Resistance (%)').reset_index(),
+                 hide_index=True, use_container_width=True)
+    st.caption("Isolate-weighted average across all regions and years in the global dataset; check your local antibiogram for local prevalence")
+
 def display_training_modules():
     """Interactive training modules with quizzes and case studies"""
 
@@ -797,103 +1023,66 @@ def display_training_modules():
             st.info("💡 Consider microbiology-guided therapy for treatment failures")
 
     elif module == "Clinical Decision Making":
-        st.markdown("""
-        ### 💊 Clinical Decision Support for AMR
-
-        #### Decision Framework:
-        1. **Patient History**: Recent antibiotic exposure? Hospitalized recently?
-        2. **Local Prevalence**: What resistance patterns exist locally?
-        3. **Antibiotic Selection**: Narrowest spectrum for shortest duration
-        4. **Monitoring**: Clinical response and microbiology follow-up
-        """)
+        st.markdown(_CDS_MARKDOWN)
 
         # Interactive decision tree
-        st.markdown("#### 📋 Patient Assessment Tool")
-
-        age = st.slider("Patient Age:", 0, 100, 50)
-        hospitalization = st.checkbox("Recent Hospitalization (<30 days)")
-        antibiotic_history = st.checkbox("Antibiotic use in last 3 months")
-        infection_type = st.selectbox("Infection Type:", ["UTI", "Pneumonia", "Skin/Soft Tissue", "Intra-abdominal"])
-
-        # Risk calculation
-        risk_score = 0
-        risk_score += (1 if age > 65 else 0)
-        risk_score += (2 if hospitalization else 0)
-        risk_score += (1 if antibiotic_history else 0)
-
-        if risk_score >= 2:
-            risk_level = "🔴 High Risk - Consider broad-spectrum with microbiological confirmation"
-        elif risk_score == 1:
-            risk_level = "🟡 Medium Risk - Microbiological testing recommended"
-        else:
-            risk_level = "🟢 Low Risk - Empirical therapy may be appropriate"
-
-        st.metric("AMR Risk Assessment", risk_level)
-        st.caption(f"Risk Score: {risk_score}/4 based on patient factors")
+        display_clinical_decision_support()
 
     # Add more modules as needed...
 
+@st.fragment
 def display_quiz_assessment():
     """Interactive quiz assessment platform"""
 
-    st.markdown('<h2 class="section-header">❓ AMR Knowledge Assessment</h2>', unsafe_allow_html=True)
+    st.markdown(_QUIZ_HEADER, unsafe_allow_html=True)
 
-    # Simple quiz implementation
-    questions = [
-        {
-            "question": "What is the primary mechanism of methicillin-resistant Staphylococcus aureus (MRSA)?",
-            "options": ["Efflux pumps", "Target site modification", "Enzymatic degradation", "Plasma membrane changes"],
-            "correct": 1,
-            "explanation": "MRSA develops resistance through altered penicillin-binding proteins (PBP2a) in the bacterial cell wall."
-        },
-        {
-            "question": "Which antibiotic class is considered 'last resort' for carbapenem-resistant infections?",
-            "options": ["Tetracyclines", "Colistin (polymyxin)", "Trimethoprim-sulfamethoxazole", "Nitrofurantoin"],
-            "correct": 1,
-            "explanation": "Colistin (polymyxin) is considered a last resort antibiotic due to its toxicity and limited alternatives."
-        },
-        {
-            "question": "What WHO strategy phase are we currently in for antimicrobial resistance?",
-            "options": ["Awareness", "Action", "Containment", "Prevention"],
-            "correct": 1,
-            "explanation": "The WHO Global Action Plan has three phases: Awareness (2015-2020), Action (2021-2025), and Containment (2026-2030)."
-        }
-    ]
+    questions = QUIZ_QUESTIONS
 
-    # Quiz interface
-    score = 0
-    total_questions = len(questions)
+    # Submitted results persist across reruns, keyed by question index
+    if "quiz_answers" not in st.session_state:
+        st.session_state.quiz_answers = {}
 
-    for i, q in enumerate(questions):
-        st.markdown(f"**Question {i+1}:** {q['question']}")
+    # Quiz interface; the form defers reruns until the quiz is submitted
+    with st.form("quiz_form"):
+        answers = []
+        for i, q in enumerate(questions):
+            # One container per question keeps each block at a stable position
+            with st.container():
+                st.markdown(_QUIZ_PROMPTS[i])
 
-        user_answer = st.radio(
-            f"Select your answer:",
-            q['options'],
-            key=f"q{i}"
-        )
+                answers.append(st.radio(
+                    "Select your answer:",
+                    q.options,
+                    key=_QUIZ_KEYS[i]
+                ))
 
-        if st.button(f"Check Answer {i+1}", key=f"btn{i}"):
-            correct_answer = q['options'][q['correct']]
-            if user_answer == correct_answer:
-                st.success("✅ Correct!")
-                score += 1
-            else:
-                st.error(f"❌ Incorrect. The correct answer is: {correct_answer}")
+        submitted = st.form_submit_button("Submit Quiz")
 
-            st.info(f"💡 {q['explanation']}")
-            st.markdown("---")
+    if submitted:
+        st.session_state.quiz_answers = {
+            i: answer == q.correct_answer
+            for i, (answer, q) in enumerate(zip(answers, questions))
+        }
 
-    if st.button("Calculate Final Score"):
-        percentage = (score / total_questions) * 100
-        st.metric("Quiz Score", f"{score}/{total_questions} ({percentage:.1f}%)")
+    if st.session_state.quiz_answers:
+        for i, q in enumerate(questions):
+            # One markdown delta per question instead of four elements
+            if st.session_state.quiz_answers[i]:
+                outcome = "✅ Correct!"
+            else:
+                outcome = f"❌ Incorrect. The correct answer is: {q.correct_answer}"
+            with st.container():
+                st.markdown(f"**Question {i+1}**\n\n{outcome}\n\n💡 {q.explanation}\n\n---")
 
-        if percentage >= 80:
-            st.success("🎉 Excellent! You demonstrate strong AMR knowledge.")
-        elif percentage >= 60:
-            st.info("👍 Good effort! Review key concepts for deeper understanding.")
-        else:
-            st.warning("📚 Additional study recommended. Focus on AMR mechanisms and stewardship.")
+        score = sum(st.session_state.quiz_answers.values())
+        # Integer percentage math: whole percent (floored) for the bands, tenths rounded half up for display
+        percentage = score * 100 // _TOTAL_QUESTIONS
+        tenths = (score * 2000 + _TOTAL_QUESTIONS) // (2 * _TOTAL_QUESTIONS)
+        st.metric("Quiz Score", f"{score}/{_TOTAL_QUESTIONS} ({tenths // 10}.{tenths % 10}%)")
+
+        level, message = _SCORE_BANDS[bisect.bisect_right(_SCORE_BOUNDS, percentage)][1:]
+        getattr(st, level)(message)
 
 if __name__ == "__main__":
+    warnings.filterwarnings('ignore')
     main()